@@ -0,0 +1,3 @@
+"""
+TOONVERSE 엔진 공통 모듈
+"""
@@ -0,0 +1,103 @@
+"""
+엔진 공통 에셋 서빙
+
+엔진이 돌려주는 파일 경로(image_url, lettered_image_url, final_webtoon_url ...)를
+STORAGE_DIR 기준 상대 경로로 직접 내려준다.
+
+- Starlette FileResponse 사용: Range 요청(206)과 If-Range 처리,
+  서버가 http.response.pathsend를 지원하면 파일 내용을 거치지 않고 전송
+- ETag는 내용 해시 (assets/는 파일명이 곧 sha256, 나머지는 파일 해시를 메모리 캐시)
+- If-None-Match가 맞으면 304
+- 내용 주소 경로(assets/, derivatives/)는 Cache-Control immutable,
+  에피소드 경로(episodes/)는 다시 만들면 바뀌므로 no-cache (ETag로 재검증)
+
+    install_asset_routes(app, "/engine/image", STORAGE_DIR)
+
+    GET /engine/image/files/assets/ab/cd/<sha256>.png
+    GET /engine/image/files/episodes/07/7/episode_007_final.png
+"""
+import os
+import re
+from functools import lru_cache
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
+
+from common.storage import hash_file
+
+# 서빙 대상 최상위 디렉토리 (jobs/, cache/ 등 내부 파일은 제외)
+SERVED_DIRS = ("assets", "episodes", "derivatives")
+IMMUTABLE_DIRS = ("assets", "derivatives")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MUTABLE_CACHE_CONTROL = "public, no-cache"
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+def install_asset_routes(app: FastAPI, prefix: str, root: str):
+    """
+    GET/HEAD {prefix}/files/{path} 라우트 추가
+    """
+    async def get_asset(path: str, request: Request):
+        file_path, top_dir = resolve_asset_path(root, path)
+        try:
+            stat_result = await run_in_threadpool(os.stat, file_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Asset not found: {path}")
+        
+        etag = await run_in_threadpool(content_etag, file_path, stat_result)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if top_dir in IMMUTABLE_DIRS else MUTABLE_CACHE_CONTROL
+        }
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        
+        return FileResponse(file_path, headers=headers, stat_result=stat_result)
+    
+    app.add_api_route(f"{prefix}/files/{{path:path}}", get_asset, methods=["GET", "HEAD"], summary="Serve stored asset")
+
+def asset_endpoint(prefix: str) -> str:
+    """
+    /health에 표시할 에셋 서빙 경로
+    """
+    return f"{prefix}/files/{{path}}"
+
+def resolve_asset_path(root: str, path: str) -> tuple:
+    """
+    상대 경로를 실제 파일 경로로 변환 (저장소 밖, 내부 디렉토리, 임시 파일은 404)
+    """
+    root = os.path.realpath(root)
+    file_path = os.path.realpath(os.path.join(root, path))
+    relative = os.path.relpath(file_path, root)
+    top_dir = relative.split(os.sep, 1)[0]
+    
+    if relative.startswith("..") or top_dir not in SERVED_DIRS or file_path.endswith(".part"):
+        raise HTTPException(status_code=404, detail=f"Asset not found: {path}")
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail=f"Asset not found: {path}")
+    return file_path, top_dir
+
+def content_etag(path: str, stat_result: os.stat_result) -> str:
+    """
+    내용 해시 기반 strong ETag
+    """
+    digest = os.path.basename(path).split(".", 1)[0]
+    if not SHA256_PATTERN.match(digest):
+        digest = hash_file_cached(path, stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+    return f'"{digest}"'
+
+@lru_cache(maxsize=4096)
+def hash_file_cached(path: str, inode: int, mtime_ns: int, size: int) -> str:
+    # os.replace로 교체되면 inode/mtime이 바뀌므로 새로 계산
+    return hash_file(path)
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    If-None-Match 비교 (weak 비교라 W/ 접두어는 무시)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
@@ -0,0 +1,134 @@
+"""
+엔진 공통 JSON 결과 캐시
+
+LLM 응답처럼 비용이 큰 JSON 결과를 입력 해시 키로 SQLite 파일에 보관한다.
+TTL이 지난 항목은 조회 시 무시하고, 항목 수/전체 크기가 한도를 넘으면
+가장 오래 사용하지 않은 항목부터 삭제한다 (LRU). 여러 워커 프로세스가 같은 파일을 공유할 수 있다.
+
+    cache = JsonCache("/path/storyboards.sqlite3", ttl_seconds=7 * 24 * 3600, max_entries=1000)
+    key = JsonCache.make_key("gpt-4", script_text, genre)
+    value = cache.get(key)
+    if value is None:
+        value = ...
+        cache.put(key, value)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+class JsonCache:
+    """
+    SQLite 기반 JSON 캐시 (TTL + 항목 수/크기 한도 LRU)
+    """
+    
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int, max_bytes: Optional[int] = None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+    
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _connect(self) -> sqlite3.Connection:
+        # 첫 사용 시 연결 (임포트만으로 파일을 만들지 않음)
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        return self._conn
+    
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.expired += 1
+                self.misses += 1
+                return None
+            conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+    
+    def put(self, key: str, value: Any):
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now)
+            )
+            self._evict(conn, now)
+    
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        self.expired += conn.execute(
+            "DELETE FROM cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        
+        entries, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        if entries <= self.max_entries and (self.max_bytes is None or total_bytes <= self.max_bytes):
+            return
+        
+        for key, size in conn.execute("SELECT key, size FROM cache ORDER BY accessed_at").fetchall():
+            if entries <= self.max_entries and (self.max_bytes is None or total_bytes <= self.max_bytes):
+                break
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            entries -= 1
+            total_bytes -= size
+            self.evictions += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total_bytes = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "cache_path": self.path,
+            "entries": entries,
+            "size_mb": round(total_bytes / (1024 * 1024), 2),
+            "max_entries": self.max_entries,
+            "max_size_mb": round(self.max_bytes / (1024 * 1024), 2) if self.max_bytes else None,
+            "ttl_hours": round(self.ttl_seconds / 3600, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+    
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,321 @@
+"""
+엔진 공통 비동기 작업(Job) API
+
+긴 작업(이미지 배치 생성 등)을 HTTP 연결에 묶어두지 않도록
+제출(POST) 즉시 job_id를 돌려주고, 상태/진행률/결과는 조회(GET)로 확인한다.
+
+- 작업 기록은 엔진별 SQLite 파일에 저장 (재시작 후에도 조회 가능, 대기 중이던 작업은 다시 실행)
+- 실행은 프로세스 내 asyncio 워커가 담당 (동기 핸들러는 스레드 풀에서 실행)
+- 핸들러 안에서 report_progress(done, total)로 진행률 갱신
+
+    jobs = JobManager("image")
+    jobs.register("generate-batch", generate_batch_images, ImageEngineRequest)
+    jobs.install(app, "/engine/image")
+
+    POST /engine/image/jobs/generate-batch  → 202 {"job_id": ..., "status": "queued"}
+    GET  /engine/image/jobs/{job_id}        → 상태/진행률/결과
+    POST /engine/image/jobs/{job_id}/cancel → 취소
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from common.metrics import JOB_DURATION
+
+JOB_DIR = os.getenv(
+    "ENGINE_JOB_DIR",
+    os.path.join(os.getenv("IMAGE_STORAGE_DIR", "/var/www/toonverse/webapp/storage/images"), "jobs")
+)
+JOB_WORKERS = int(os.getenv("ENGINE_JOB_WORKERS", "2"))
+JOB_RETENTION_HOURS = int(os.getenv("ENGINE_JOB_RETENTION_HOURS", "72"))
+
+# 현재 실행 중인 작업 (report_progress가 어느 작업을 갱신할지 결정)
+current_job: ContextVar[Optional[tuple]] = ContextVar("current_job", default=None)
+
+def report_progress(done: int, total: int):
+    """
+    실행 중인 작업의 진행률 갱신 (작업 밖에서 호출되면 아무 일도 하지 않음)
+    """
+    job = current_job.get()
+    if job is None or total <= 0:
+        return
+    store, job_id = job
+    store.update(job_id, progress=round(min(done / total, 1.0), 3))
+
+class JobStore:
+    """
+    SQLite 기반 작업 저장소 (워커 스레드에서도 쓰므로 연결 하나를 락으로 보호)
+    """
+    
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                request TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+    
+    def create(self, kind: str, request: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO jobs (id, kind, status, request, created_at) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(request, ensure_ascii=False), datetime.now().isoformat())
+            )
+        return job_id
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self.lock:
+            self.conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+    
+    def queued_ids(self) -> list:
+        with self.lock:
+            rows = self.conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at").fetchall()
+        return [row["id"] for row in rows]
+    
+    def recover(self):
+        """
+        재시작 전에 실행 중이던 작업은 결과를 알 수 없으므로 실패 처리
+        (외부 API 비용이 드는 작업을 자동으로 다시 실행하지 않음)
+        """
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'interrupted by engine restart', finished_at = ? "
+                "WHERE status = 'running'",
+                (datetime.now().isoformat(),)
+            )
+    
+    def prune(self, retention_hours: int):
+        cutoff = (datetime.now() - timedelta(hours=retention_hours)).isoformat()
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed', 'cancelled') AND finished_at < ?",
+                (cutoff,)
+            )
+    
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class JobManager:
+    """
+    엔진별 작업 큐 + asyncio 워커 풀
+    """
+    
+    def __init__(self, engine: str, job_dir: str = JOB_DIR, workers: int = JOB_WORKERS):
+        self.engine = engine
+        self.path = os.path.join(job_dir, f"{engine}_jobs.sqlite3")
+        self.workers = workers
+        self.handlers: Dict[str, tuple] = {}
+        self.store: Optional[JobStore] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker_tasks = []
+        self.running: Dict[str, asyncio.Task] = {}
+        self.stopping = False
+    
+    def register(self, kind: str, handler: Callable, request_model):
+        """
+        작업 종류 등록 (handler는 기존 엔드포인트 함수를 그대로 사용, async/sync 모두 가능)
+        """
+        self.handlers[kind] = (handler, request_model)
+    
+    def install(self, app: FastAPI, prefix: str):
+        """
+        작업 API 라우트 추가 및 시작/종료 훅 등록
+        """
+        for kind, (_, request_model) in self.handlers.items():
+            app.add_api_route(
+                f"{prefix}/jobs/{kind}",
+                self.make_submit_endpoint(kind, request_model),
+                methods=["POST"],
+                status_code=202,
+                summary=f"Submit {kind} job"
+            )
+        app.add_api_route(f"{prefix}/jobs/{{job_id}}", self.get_job, methods=["GET"], summary="Get job status")
+        app.add_api_route(f"{prefix}/jobs/{{job_id}}/cancel", self.cancel_job, methods=["POST"], summary="Cancel job")
+        app.add_event_handler("startup", self.start)
+        app.add_event_handler("shutdown", self.stop)
+    
+    def endpoints(self, prefix: str) -> list:
+        """
+        /health에 표시할 작업 API 경로 목록
+        """
+        return [f"{prefix}/jobs/{kind}" for kind in self.handlers] + [
+            f"{prefix}/jobs/{{job_id}}",
+            f"{prefix}/jobs/{{job_id}}/cancel"
+        ]
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": len(self.running),
+            "queued": self.queue.qsize() if self.queue else 0,
+            "by_status": self.store.counts() if self.store else {}
+        }
+    
+    async def start(self):
+        self.stopping = False
+        self.store = JobStore(self.path)
+        self.store.recover()
+        self.store.prune(JOB_RETENTION_HOURS)
+        
+        self.queue = asyncio.Queue()
+        for job_id in self.store.queued_ids():
+            self.queue.put_nowait(job_id)
+        
+        self.worker_tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+    
+    async def stop(self):
+        # 실행 중인 작업은 중단 사유를 남기고 취소
+        self.stopping = True
+        running = list(self.running.values())
+        for task in running + self.worker_tasks:
+            task.cancel()
+        await asyncio.gather(*running, *self.worker_tasks, return_exceptions=True)
+        self.worker_tasks = []
+        if self.store:
+            self.store.close()
+            self.store = None
+    
+    def make_submit_endpoint(self, kind: str, request_model):
+        async def submit(request: request_model):
+            if self.store is None:
+                raise HTTPException(status_code=503, detail="Job queue is not running")
+            
+            job_id = self.store.create(kind, request.model_dump())
+            self.queue.put_nowait(job_id)
+            return {"job_id": job_id, "kind": kind, "status": "queued"}
+        
+        return submit
+    
+    async def get_job(self, job_id: str):
+        job = self.store.get(job_id) if self.store else None
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        return serialize_job(job)
+    
+    async def cancel_job(self, job_id: str):
+        job = self.store.get(job_id) if self.store else None
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        
+        if job["status"] == "queued":
+            # 워커가 꺼낼 때 상태를 다시 확인하고 건너뜀
+            self.store.update(job_id, status="cancelled", finished_at=datetime.now().isoformat())
+        elif job["status"] == "running" and job_id in self.running:
+            # 동기 핸들러는 스레드에서 끝까지 실행되지만 결과는 버려짐
+            self.running[job_id].cancel()
+        
+        return serialize_job(self.store.get(job_id))
+    
+    async def worker(self):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                job = self.store.get(job_id)
+                if job and job["status"] == "queued":
+                    task = asyncio.create_task(self.execute(job))
+                    self.running[job_id] = task
+                    try:
+                        await task
+                    except asyncio.CancelledError:
+                        # cancel_job으로 작업만 취소된 경우에는 워커를 계속 실행
+                        if self.stopping or not task.cancelled():
+                            raise
+                    finally:
+                        self.running.pop(job_id, None)
+            finally:
+                self.queue.task_done()
+    
+    async def execute(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        handler, request_model = self.handlers[job["kind"]]
+        self.store.update(job_id, status="running", started_at=datetime.now().isoformat())
+        current_job.set((self.store, job_id))
+        started = time.perf_counter()
+        status = "failed"
+        
+        try:
+            request = request_model.model_validate(json.loads(job["request"]))
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request)
+            else:
+                response = await run_in_threadpool(handler, request)
+        except asyncio.CancelledError:
+            if self.stopping:
+                self.store.update(
+                    job_id, status="failed", error="interrupted by engine shutdown",
+                    finished_at=datetime.now().isoformat()
+                )
+            else:
+                status = "cancelled"
+                self.store.update(job_id, status="cancelled", finished_at=datetime.now().isoformat())
+            raise
+        except HTTPException as e:
+            self.store.update(job_id, status="failed", error=str(e.detail), finished_at=datetime.now().isoformat())
+        except Exception as e:
+            self.store.update(job_id, status="failed", error=str(e), finished_at=datetime.now().isoformat())
+        else:
+            status = "succeeded"
+            if hasattr(response, "model_dump"):
+                response = response.model_dump()
+            self.store.update(
+                job_id,
+                status="succeeded",
+                progress=1.0,
+                result=json.dumps(response, ensure_ascii=False, default=str),
+                finished_at=datetime.now().isoformat()
+            )
+        finally:
+            JOB_DURATION.observe(time.perf_counter() - started, kind=job["kind"], status=status)
+
+def serialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "result": json.loads(job["result"]) if job["result"] else None,
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"]
+    }
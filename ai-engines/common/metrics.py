@@ -0,0 +1,343 @@
+"""
+엔진 공통 Prometheus 메트릭
+
+외부 의존성 없이 Prometheus 텍스트 포맷(0.0.4)으로 GET /metrics를 내보낸다.
+
+- HTTP 미들웨어: 엔드포인트(라우트 템플릿)별 요청 수/지연 히스토그램, 진행 중 요청 수
+- 외부 API 호출: track_provider 블록의 지연 히스토그램, 진행 중 호출 수, 에러 수
+- 캐시/작업 큐처럼 이미 통계를 가진 객체는 add_collector로 스크레이프 시점에 값을 읽음
+- 값은 프로세스 단위 (uvicorn --workers N이면 워커마다 따로 수집됨)
+
+    metrics = install_metrics(app, "image", jobs)
+    metrics.add_collector(lambda: cache_samples("generation", generation_cache.stats()))
+    
+    with track_provider("openai", "images.generate"):
+        response = await client.images.generate(...)
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+from starlette.routing import Match
+
+from common.tracing import span
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 초 단위 지연 버킷 (이미지 생성처럼 수십 초 걸리는 호출까지 포함)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# (이름, 타입, 설명, 라벨, 값)
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+class Metric:
+    """
+    라벨 조합별 값을 가진 메트릭 (스레드 안전)
+    """
+    
+    type = "untyped"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.values: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, Any]) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+    
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self.values.items())
+        return [
+            (self.name, self.type, self.help_text, dict(zip(self.labelnames, key)), value)
+            for key, value in items
+        ]
+
+class Counter(Metric):
+    type = "counter"
+    
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+class Gauge(Metric):
+    type = "gauge"
+    
+    def set(self, value: float, **labels):
+        with self._lock:
+            self.values[self._key(labels)] = value
+    
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+    
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    type = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = buckets
+    
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+    
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self.values.items()]
+        
+        samples = []
+        for key, (counts, total, count) in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", self.type, self.help_text, {**labels, "le": format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_bucket", self.type, self.help_text, {**labels, "le": "+Inf"}, count))
+            samples.append((f"{self.name}_sum", self.type, self.help_text, labels, total))
+            samples.append((f"{self.name}_count", self.type, self.help_text, labels, count))
+        return samples
+
+class Registry:
+    """
+    메트릭 + 스크레이프 시점 수집 함수 목록 (모든 샘플에 engine 라벨을 붙여 출력)
+    """
+    
+    def __init__(self, metrics: Optional[List[Metric]] = None):
+        self.metrics: List[Metric] = metrics if metrics is not None else []
+        self.collectors: List[Callable[[], List[Sample]]] = []
+        self.const_labels: Dict[str, str] = {}
+    
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+    
+    def add_collector(self, collector: Callable[[], List[Sample]]):
+        self.collectors.append(collector)
+    
+    def render(self) -> str:
+        families: Dict[str, tuple] = {}
+        
+        def add(samples: List[Sample]):
+            for name, metric_type, help_text, labels, value in samples:
+                family = family_name(name, metric_type)
+                families.setdefault(family, (metric_type, help_text, []))[2].append((name, labels, value))
+        
+        for metric in self.metrics:
+            add(metric.samples())
+        for collector in self.collectors:
+            try:
+                add(collector())
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+        
+        lines = []
+        for family, (metric_type, help_text, samples) in families.items():
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {metric_type}")
+            for name, labels, value in samples:
+                labels = {**self.const_labels, **labels}
+                label_text = ",".join(f'{key}="{escape_label(str(val))}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "toonverse_http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+))
+HTTP_DURATION = REGISTRY.register(Histogram(
+    "toonverse_http_request_duration_seconds", "HTTP request latency including streamed body", ("method", "route")
+))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "toonverse_http_requests_in_flight", "HTTP requests currently being served", ("route",)
+))
+PROVIDER_DURATION = REGISTRY.register(Histogram(
+    "toonverse_provider_request_duration_seconds", "External provider call latency", ("provider", "operation", "outcome")
+))
+PROVIDER_ERRORS = REGISTRY.register(Counter(
+    "toonverse_provider_errors_total", "External provider call errors", ("provider", "operation", "error")
+))
+PROVIDER_IN_FLIGHT = REGISTRY.register(Gauge(
+    "toonverse_provider_requests_in_flight", "External provider calls in progress", ("provider", "operation")
+))
+JOB_DURATION = REGISTRY.register(Histogram(
+    "toonverse_job_duration_seconds", "Background job run time", ("kind", "status")
+))
+IMAGE_BYTES_WRITTEN = REGISTRY.register(Counter(
+    "toonverse_image_bytes_written_total", "Image bytes written to storage", ("format",)
+))
+CACHE_HITS = REGISTRY.register(Counter(
+    "toonverse_cache_hits_total", "Cache hits", ("cache",)
+))
+CACHE_MISSES = REGISTRY.register(Counter(
+    "toonverse_cache_misses_total", "Cache misses", ("cache",)
+))
+ASSET_WRITES = REGISTRY.register(Counter(
+    "toonverse_asset_writes_total", "Content-addressed asset writes (stored or deduplicated)", ("result",)
+))
+
+@contextmanager
+def track_provider(provider: str, operation: str) -> Iterator[None]:
+    """
+    외부 API 호출 구간의 지연/에러 기록 (async 호출을 감싸도 됨, 추적 중이면 구간으로도 기록)
+    """
+    PROVIDER_IN_FLIGHT.inc(provider=provider, operation=operation)
+    start = time.perf_counter()
+    outcome = "success"
+    try:
+        with span(f"{provider}.{operation}"):
+            yield
+    except Exception as e:
+        outcome = "error"
+        PROVIDER_ERRORS.inc(provider=provider, operation=operation, error=type(e).__name__)
+        raise
+    finally:
+        PROVIDER_IN_FLIGHT.dec(provider=provider, operation=operation)
+        PROVIDER_DURATION.observe(time.perf_counter() - start, provider=provider, operation=operation, outcome=outcome)
+
+def cache_samples(cache: str, stats: Dict[str, Any]) -> List[Sample]:
+    """
+    캐시 stats() 결과를 메트릭 샘플로 변환 (hits/misses/evictions, 히트율, 항목 수/크기)
+    """
+    labels = {"cache": cache}
+    samples = [
+        ("toonverse_cache_hits_total", "counter", "Cache hits", labels, stats.get("hits", 0)),
+        ("toonverse_cache_misses_total", "counter", "Cache misses", labels, stats.get("misses", 0)),
+        ("toonverse_cache_hit_ratio", "gauge", "Cache hit ratio since start", labels, stats.get("hit_rate", 0.0))
+    ]
+    if "evictions" in stats:
+        samples.append(("toonverse_cache_evictions_total", "counter", "Cache evictions", labels, stats["evictions"]))
+    if "entries" in stats:
+        samples.append(("toonverse_cache_entries", "gauge", "Cache entries", labels, stats["entries"]))
+    if "size_mb" in stats:
+        samples.append(("toonverse_cache_size_bytes", "gauge", "Cache size", labels, stats["size_mb"] * 1024 * 1024))
+    return samples
+
+def lru_cache_samples(cache: str, info) -> List[Sample]:
+    """
+    functools.lru_cache의 cache_info()를 캐시 메트릭으로 변환
+    """
+    lookups = info.hits + info.misses
+    return cache_samples(cache, {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / lookups, 3) if lookups else 0.0,
+        "entries": info.currsize
+    })
+
+def job_samples(stats: Dict[str, Any]) -> List[Sample]:
+    """
+    JobManager.stats()를 큐 길이/실행 중/상태별 작업 수 게이지로 변환
+    """
+    samples = [
+        ("toonverse_jobs_queued", "gauge", "Jobs waiting in the queue", {}, stats["queued"]),
+        ("toonverse_jobs_running", "gauge", "Jobs currently running", {}, stats["running"]),
+        ("toonverse_job_workers", "gauge", "Job worker count", {}, stats["workers"])
+    ]
+    for status, count in stats["by_status"].items():
+        samples.append(("toonverse_jobs", "gauge", "Stored jobs by status", {"status": status}, count))
+    return samples
+
+class MetricsMiddleware:
+    """
+    요청별 지연/상태 기록 ASGI 미들웨어 (스트리밍 응답은 마지막 청크까지 포함)
+    """
+    
+    def __init__(self, app, routes: list):
+        self.app = app
+        self.routes = routes
+    
+    def route_path(self, scope) -> str:
+        # 경로 변수 대신 라우트 템플릿으로 묶음 (/jobs/{job_id} 등 라벨 수 제한)
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                return getattr(route, "path", scope["path"])
+        return "unmatched"
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        route = self.route_path(scope)
+        method = scope["method"]
+        status = 500
+        start = time.perf_counter()
+        HTTP_IN_FLIGHT.inc(route=route)
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec(route=route)
+            HTTP_DURATION.observe(time.perf_counter() - start, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+
+def install_metrics(app: FastAPI, engine: str, jobs=None) -> Registry:
+    """
+    미들웨어와 GET /metrics 추가 (jobs를 넘기면 작업 큐 게이지도 수집)
+    
+    메트릭은 프로세스 공통(REGISTRY)이고 수집 함수/engine 라벨은 앱별
+    (파이프라인 엔진이 다른 엔진 모듈을 임포트해도 서로 섞이지 않음)
+    """
+    registry = Registry(REGISTRY.metrics)
+    registry.const_labels["engine"] = engine
+    if jobs is not None:
+        registry.add_collector(lambda: job_samples(jobs.stats()))
+    
+    app.add_middleware(MetricsMiddleware, routes=app.router.routes)
+    
+    async def metrics_endpoint():
+        return Response(registry.render(), media_type=CONTENT_TYPE)
+    
+    app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+    return registry
+
+def family_name(name: str, metric_type: str) -> str:
+    if metric_type == "histogram":
+        for suffix in ("_bucket", "_sum", "_count"):
+            if name.endswith(suffix):
+                return name[: -len(suffix)]
+    return name
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_value(value: float) -> str:
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int) or (isinstance(value, float) and value.is_integer()):
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,189 @@
+"""
+엔진 공통 에셋 저장소
+
+STORAGE_DIR 한 디렉토리에 panel_001_....png 식으로 평면 저장하던 방식을 대체한다.
+
+- 내용 주소 저장: assets/ab/cd/<sha256>.<ext>
+  이름이 내용에서 나오므로 에피소드끼리 덮어쓸 일이 없고, 같은 바이트는 파일 하나로 합쳐진다
+- 에피소드 경로: episodes/<episode_id % 256>/<episode_id>/...
+  최종 이미지/조각처럼 에피소드마다 하나씩 있는 결과물 (다시 만들면 교체)
+- 모든 기록은 같은 디렉토리의 임시 파일에 쓴 뒤 os.replace로 교체 (읽는 쪽은 완성된 파일만 봄)
+
+    storage = AssetStorage(STORAGE_DIR)
+    path = storage.store_bytes(png_bytes, "png")
+    path = storage.store_image(img, "png", compress_level=6)
+    final_path = storage.episode_path(12, "episode_012_final.png")
+    with atomic_path(final_path) as tmp_path:
+        img.save(tmp_path, "PNG")
+"""
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from common.metrics import ASSET_WRITES, IMAGE_BYTES_WRITTEN
+from common.tracing import span
+
+STORAGE_DIR = os.getenv("IMAGE_STORAGE_DIR", "/var/www/toonverse/webapp/storage/images")
+HASH_CHUNK_BYTES = 1024 * 1024
+
+def shard_path(root: str, key: str, filename: str, levels: int = 1) -> str:
+    """
+    키 앞부분 2글자씩으로 하위 디렉토리를 나눈 경로 (디렉토리는 미리 생성)
+    """
+    directory = os.path.join(root, *(key[i * 2:i * 2 + 2] for i in range(levels)))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """
+    같은 디렉토리의 임시 경로를 넘겨주고, 블록이 정상 종료되면 path로 교체
+    (예외가 나면 임시 파일만 지우고 기존 파일은 그대로 둠)
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex[:12]}.part"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class AssetStorage:
+    """
+    내용 주소(중복 제거) + 에피소드 경로 저장소
+    """
+    
+    def __init__(self, root: str = STORAGE_DIR):
+        self.root = root
+        self.asset_dir = os.path.join(root, "assets")
+        self.episode_dir = os.path.join(root, "episodes")
+        self.staging_dir = os.path.join(self.asset_dir, "staging")
+        self.stored = 0
+        self.deduplicated = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.staging_dir, exist_ok=True)
+        os.makedirs(self.episode_dir, exist_ok=True)
+    
+    def content_path(self, digest: str, ext: str) -> str:
+        return shard_path(self.asset_dir, digest, f"{digest}.{ext}", levels=2)
+    
+    def episode_path(self, episode_id: int, *parts: str) -> str:
+        """
+        에피소드 전용 경로 (마지막 요소의 상위 디렉토리까지 생성)
+        """
+        path = os.path.join(self.episode_dir, f"{episode_id % 256:02x}", str(episode_id), *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+    
+    def staging_path(self, ext: str) -> str:
+        """
+        store_file(move=True)로 넘길 임시 파일 경로 (저장소와 같은 파일시스템이라 rename 가능)
+        """
+        return os.path.join(self.staging_dir, f"{uuid.uuid4().hex}.{ext}.part")
+    
+    def store_bytes(self, data: bytes, ext: str) -> str:
+        with span("hash"):
+            path = self.content_path(hashlib.sha256(data).hexdigest(), ext)
+        if os.path.exists(path):
+            self._count(ext, deduplicated=True)
+            return path
+        
+        with span("write"), atomic_path(path) as tmp_path:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+        self._count(ext, size=len(data))
+        return path
+    
+    def store_file(self, source_path: str, ext: str, move: bool = False, digest: Optional[str] = None) -> str:
+        """
+        파일을 내용 주소로 저장
+        
+        move=True면 source_path(staging_path로 만든 임시 파일)를 옮기고, 아니면 하드링크/복사.
+        이미 있는 내용이면 기존 파일 경로를 돌려줌. digest를 이미 계산했다면 넘겨서 재해시를 생략
+        """
+        return self.write_file(source_path, ext, move, digest)[0]
+    
+    def write_file(
+        self,
+        source_path: str,
+        ext: str,
+        move: bool = False,
+        digest: Optional[str] = None
+    ) -> Tuple[str, int]:
+        """
+        store_file과 같되 (경로, 실제로 기록한 바이트 수) 반환 (이미 있던 내용이면 0)
+        """
+        if digest is None:
+            with span("hash"):
+                digest = hash_file(source_path)
+        path = self.content_path(digest, ext)
+        if os.path.exists(path):
+            if move:
+                os.remove(source_path)
+            self._count(ext, deduplicated=True)
+            return path, 0
+        
+        size = os.path.getsize(source_path)
+        with span("write"):
+            if move:
+                os.replace(source_path, path)
+            else:
+                with atomic_path(path) as tmp_path:
+                    try:
+                        os.link(source_path, tmp_path)
+                    except OSError:
+                        shutil.copyfile(source_path, tmp_path)
+        self._count(ext, size=size)
+        return path, size
+    
+    def store_image(self, image, fmt: str, **save_options) -> str:
+        """
+        PIL 이미지를 인코딩해 내용 주소로 저장
+        """
+        return self.write_image(image, fmt, **save_options)[0]
+    
+    def write_image(self, image, fmt: str, **save_options) -> Tuple[str, int]:
+        """
+        store_image와 같되 (경로, 실제로 기록한 바이트 수) 반환 (이미 있던 내용이면 0)
+        """
+        ext = "jpg" if fmt == "jpeg" else fmt
+        tmp_path = self.staging_path(ext)
+        try:
+            # 파일로 바로 인코딩하므로 encode 구간에 디스크 기록도 포함
+            with span("encode"):
+                image.save(tmp_path, fmt.upper(), **save_options)
+            return self.write_file(tmp_path, ext, move=True)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def _count(self, ext: str, size: int = 0, deduplicated: bool = False):
+        with self._lock:
+            if deduplicated:
+                self.deduplicated += 1
+            else:
+                self.stored += 1
+                self.bytes_written += size
+        ASSET_WRITES.inc(result="deduplicated" if deduplicated else "stored")
+        if size:
+            IMAGE_BYTES_WRITTEN.inc(size, format=ext)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "root": self.root,
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "written_mb": round(self.bytes_written / (1024 * 1024), 2)
+        }
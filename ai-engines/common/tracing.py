@@ -0,0 +1,257 @@
+"""
+엔진 공통 구간 추적 (요청 하나의 단계별 소요 시간)
+
+느린 요청이 디코드/리사이즈/그리기/인코딩/디스크 기록 중 어디서 시간을 썼는지 보기 위한 가벼운 타이머.
+
+- 요청 헤더 X-Toonverse-Trace: 1 또는 요청 플래그(options.trace / trace)로 켬
+  (작업 큐로 제출한 요청은 헤더가 실행 시점까지 전달되지 않으므로 플래그 사용)
+- 켜진 요청은 응답 metadata.timings에 단계별 횟수/합계(ms)가 붙음
+  (중첩되거나 병렬 스레드에서 겹친 구간도 각각 더하므로 합이 total_ms보다 클 수 있음)
+- ENGINE_TRACE_DIR를 지정하면 요청마다 Chrome Trace Event 형식 JSON 파일로 내보냄
+  (chrome://tracing 또는 ui.perfetto.dev에서 스레드/프로세스별 타임라인으로 확인)
+- 꺼져 있으면 span()은 ContextVar 조회 한 번으로 끝남
+
+    begin_trace("lettering.apply", request.trace)
+    with span("decode"):
+        img = Image.open(path)
+        img.load()
+    metadata = {..., **trace_metadata()}
+"""
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+
+TRACE_HEADER = b"x-toonverse-trace"
+TRACE_ID_HEADER = b"x-toonverse-trace-id"
+TRACE_DIR = os.getenv("ENGINE_TRACE_DIR", "")
+
+# (이름, 시작 perf_counter, 소요 초, pid, 스레드 id)
+SpanRecord = Tuple[str, float, float, int, int]
+
+class Trace:
+    """
+    요청 하나의 구간 기록 (여러 스레드에서 동시에 추가해도 안전)
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.start = time.perf_counter()
+        self.started_at = time.time()
+        self.end: Optional[float] = None
+        self.spans: List[SpanRecord] = []
+        self.exported_path: Optional[str] = None
+        self._lock = threading.Lock()
+    
+    def add(self, name: str, start: float, duration: float):
+        record = (name, start, duration, os.getpid(), threading.get_ident())
+        with self._lock:
+            self.spans.append(record)
+    
+    def extend(self, spans: List[SpanRecord]):
+        """
+        워커 프로세스에서 돌려받은 구간 합치기 (perf_counter는 시스템 공통 단조 시계라 그대로 사용)
+        """
+        with self._lock:
+            self.spans.extend(spans)
+    
+    def phases(self) -> Dict[str, Dict[str, Any]]:
+        """
+        구간 이름별 횟수/합계 (오래 걸린 순)
+        """
+        with self._lock:
+            spans = list(self.spans)
+        
+        totals: Dict[str, list] = {}
+        for name, _, duration, _, _ in spans:
+            total = totals.setdefault(name, [0, 0.0])
+            total[0] += 1
+            total[1] += duration
+        return {
+            name: {"count": count, "total_ms": round(seconds * 1000, 2)}
+            for name, (count, seconds) in sorted(totals.items(), key=lambda item: -item[1][1])
+        }
+    
+    def summary(self) -> Dict[str, Any]:
+        end = self.end if self.end is not None else time.perf_counter()
+        summary = {
+            "trace_id": self.trace_id,
+            "total_ms": round((end - self.start) * 1000, 2),
+            "phases": self.phases()
+        }
+        if self.exported_path:
+            summary["trace_file"] = self.exported_path
+        return summary
+    
+    def finish(self) -> Dict[str, Any]:
+        """
+        추적 종료 후 요약 반환 (여러 번 불러도 종료 시각 기록/파일 내보내기는 처음 한 번만)
+        """
+        with self._lock:
+            first = self.end is None
+            if first:
+                self.end = time.perf_counter()
+        if first and TRACE_DIR:
+            try:
+                self.exported_path = export_trace(self, TRACE_DIR)
+            except OSError as e:
+                print(f"Trace export error: {e}")
+        return self.summary()
+
+# 현재 요청의 추적 (없으면 span()은 아무것도 기록하지 않음)
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    블록 실행 시간을 현재 추적에 name 구간으로 기록 (예외가 나도 기록)
+    """
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, start, time.perf_counter() - start)
+
+def begin_trace(name: str, enabled: Any = False) -> Optional[Trace]:
+    """
+    요청 플래그가 켜져 있으면 현재 컨텍스트에서 추적 시작 (헤더로 이미 추적 중이면 그 추적 사용)
+    
+    동기 핸들러는 요청마다 복사된 컨텍스트(스레드 풀), async 핸들러/작업은 각자의 태스크에서
+    실행되므로 설정한 추적이 다른 요청으로 새지 않는다
+    """
+    trace = current_trace.get()
+    if trace is None and enabled:
+        trace = Trace(name)
+        current_trace.set(trace)
+    return trace
+
+def trace_metadata() -> Dict[str, Any]:
+    """
+    응답 metadata에 붙일 단계별 시간 ({"timings": ...}, 추적 중이 아니면 빈 dict)
+    """
+    trace = current_trace.get()
+    if trace is None:
+        return {}
+    return {"timings": trace.finish()}
+
+def bind_trace(fn: Callable) -> Callable:
+    """
+    스레드 풀에 넘길 함수를 현재 추적에 묶음
+    (ThreadPoolExecutor는 컨텍스트를 복사하지 않으므로 워커 스레드의 구간이 빠지지 않도록)
+    """
+    trace = current_trace.get()
+    if trace is None:
+        return fn
+    
+    def run(*args, **kwargs):
+        token = current_trace.set(trace)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            current_trace.reset(token)
+    return run
+
+def run_traced(fn: Callable, *args) -> tuple:
+    """
+    워커 프로세스에서 추적을 켜고 fn 실행 후 (결과, 구간 목록) 반환 (부모가 Trace.extend로 합침)
+    """
+    trace = Trace(getattr(fn, "__name__", "worker"))
+    token = current_trace.set(trace)
+    try:
+        return fn(*args), trace.spans
+    finally:
+        current_trace.reset(token)
+
+def export_trace(trace: Trace, directory: str) -> str:
+    """
+    Chrome Trace Event 형식(JSON)으로 기록 후 파일 경로 반환
+    """
+    os.makedirs(directory, exist_ok=True)
+    
+    def timestamp_us(start: float) -> float:
+        return round((trace.started_at + start - trace.start) * 1_000_000, 1)
+    
+    pid = os.getpid()
+    events = [{
+        "name": trace.name,
+        "ph": "X",
+        "ts": timestamp_us(trace.start),
+        "dur": round(((trace.end or time.perf_counter()) - trace.start) * 1_000_000, 1),
+        "pid": pid,
+        "tid": 0,
+        "args": {"trace_id": trace.trace_id}
+    }]
+    with trace._lock:
+        spans = list(trace.spans)
+    for name, start, duration, span_pid, thread_id in spans:
+        events.append({
+            "name": name,
+            "ph": "X",
+            "ts": timestamp_us(start),
+            "dur": round(duration * 1_000_000, 1),
+            "pid": span_pid,
+            "tid": thread_id
+        })
+    
+    label = re.sub(r"[^0-9A-Za-z._-]+", "_", trace.name).strip("_")
+    filename = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(trace.started_at))}_{label}_{trace.trace_id}.json"
+    path = os.path.join(directory, filename)
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    os.replace(tmp_path, path)
+    return path
+
+class TracingMiddleware:
+    """
+    X-Toonverse-Trace 헤더가 있는 요청을 추적하는 ASGI 미들웨어
+    (응답에 X-Toonverse-Trace-Id를 붙이고, 스트리밍 응답은 마지막 청크까지 포함해 종료)
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        value = dict(scope["headers"]).get(TRACE_HEADER, b"").strip().lower()
+        if value in (b"", b"0", b"false", b"off"):
+            await self.app(scope, receive, send)
+            return
+        
+        trace = Trace(f"{scope['method']} {scope['path']}")
+        token = current_trace.set(trace)
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (TRACE_ID_HEADER, trace.trace_id.encode())]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_trace.reset(token)
+            # 파일 내보내기가 있으므로 스레드 풀에서
+            await run_in_threadpool(trace.finish)
+
+def install_tracing(app: FastAPI):
+    """
+    헤더 기반 추적 미들웨어 추가 (요청 플래그 추적은 핸들러의 begin_trace로)
+    """
+    app.add_middleware(TracingMiddleware)
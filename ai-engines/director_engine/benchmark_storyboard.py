@@ -0,0 +1,120 @@
+"""
+콘티 생성 벤치마크 (single vs scenes)
+
+목(mock) LLM을 붙여서 씬 수/패널 수별로 한 번에 생성(single)과
+씬 분할 동시 생성(scenes)의 소요 시간을 비교한다.
+목 LLM은 출력 패널 수에 비례해 지연되고(출력 토큰 생성 시간), 패널당 토큰 수 x 패널 수가
+max_tokens를 넘으면 잘린 JSON을 돌려준다 (이 경우 엔진은 더미 데이터로 폴백).
+
+    python benchmark_storyboard.py --panels 40,60,80 --scenes 8 --per-panel 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+# main 임포트 전에 캐시 경로를 임시 디렉토리로 돌린다
+os.environ["IMAGE_STORAGE_DIR"] = tempfile.mkdtemp(prefix="toonverse_bench_")
+os.environ.pop("OPENAI_API_KEY", None)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main  # noqa: E402
+
+TARGET_PATTERN = re.compile(r"시나리오를 (\d+)개의 패널로")
+
+
+class MockCompletions:
+    def __init__(self, base_latency: float, per_panel: float, tokens_per_panel: int):
+        self.base_latency = base_latency
+        self.per_panel = per_panel
+        self.tokens_per_panel = tokens_per_panel
+        self.calls = 0
+
+    async def create(self, messages, max_tokens: int, **kwargs):
+        self.calls += 1
+        target = int(TARGET_PATTERN.search(messages[0]["content"]).group(1))
+
+        # 출력 토큰 한도까지만 생성
+        produced = min(target, max_tokens // self.tokens_per_panel)
+        await asyncio.sleep(self.base_latency + self.per_panel * produced)
+
+        panels = [
+            {
+                "panel_number": i + 1,
+                "scene": "mock",
+                "location": "mock",
+                "characters": ["주인공"],
+                "action": "걷는다",
+                "dialogue": "",
+                "camera_angle": "wide shot",
+                "mood": "serious",
+                "visual_prompt": "a street",
+            }
+            for i in range(produced)
+        ]
+        content = json.dumps({"panels": panels}, ensure_ascii=False)
+        if produced < target:
+            content = content[: len(content) * 9 // 10]  # 잘린 응답
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def make_script(scenes: int, lines_per_scene: int = 6) -> str:
+    parts = []
+    for s in range(scenes):
+        parts.append(f"## 씬 {s + 1} - 장면 {s + 1}")
+        # 씬마다 분량을 다르게 해서 패널 배분도 확인
+        for line in range(lines_per_scene + s % 3 * 2):
+            parts.append(f"주인공이 {s + 1}번째 장소에서 {line + 1}번째 행동을 한다.")
+    return "\n".join(parts)
+
+
+def run(panel_counts, scenes: int, base_latency: float, per_panel: float, tokens_per_panel: int):
+    completions = MockCompletions(base_latency, per_panel, tokens_per_panel)
+    main.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    script = make_script(scenes)
+
+    print(f"scenes={scenes} base_latency={base_latency}s per_panel={per_panel}s "
+          f"tokens_per_panel={tokens_per_panel} (max_tokens=4000)")
+    print(f"{'panels':>7} {'mode':>7} {'wall_s':>8} {'calls':>6} {'returned':>9} {'fallback':>9}")
+    for target in panel_counts:
+        for mode in ("single", "scenes"):
+            request = main.DirectorRequest(
+                project={"title": "Benchmark", "genre": "action", "tone": "serious"},
+                episode={"script_text": script},
+                inputs={"target_panels": target},
+                options={"storyboard_mode": mode, "bypass_cache": True},
+            )
+            completions.calls = 0
+            start = time.perf_counter()
+            response = asyncio.run(main.create_storyboard(request))
+            elapsed = time.perf_counter() - start
+
+            panels = response.result["panels"]
+            numbers = [panel["panel_number"] for panel in panels]
+            assert numbers == list(range(1, len(panels) + 1)), "panels not renumbered"
+            fallback = sum(1 for panel in panels if panel["location"] != "mock")
+            print(f"{target:>7} {response.metadata['storyboard_mode']:>7} {elapsed:>8.2f} "
+                  f"{completions.calls:>6} {len(panels):>9} {fallback:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Director storyboard single vs per-scene benchmark")
+    parser.add_argument("--panels", default="40,60,80")
+    parser.add_argument("--scenes", type=int, default=8)
+    parser.add_argument("--base-latency", type=float, default=0.5, help="mock LLM latency per call (s)")
+    parser.add_argument("--per-panel", type=float, default=0.1, help="mock LLM latency per generated panel (s)")
+    parser.add_argument("--tokens-per-panel", type=int, default=150)
+    args = parser.parse_args()
+
+    run(
+        [int(p) for p in args.panels.split(",")],
+        args.scenes,
+        args.base_latency,
+        args.per_panel,
+        args.tokens_per_panel,
+    )
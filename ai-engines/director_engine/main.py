@@ -1,12 +1,26 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 import os
+import sys
 import json
+import asyncio
 import time
+import httpx
 from datetime import datetime
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from pathlib import Path
+
+# 공통 모듈 (ai-engines 디렉토리 기준 임포트)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.cache import JsonCache  # noqa: E402
+from common.jobs import JobManager  # noqa: E402
+from common.metrics import cache_samples, install_metrics, track_provider  # noqa: E402
+from common.tracing import begin_trace, install_tracing, trace_metadata  # noqa: E402
 
 app = FastAPI(
     title="TOONVERSE Director Engine",
@@ -23,10 +37,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# OpenAI 클라이언트 초기화
+# OpenAI 클라이언트 초기화 (요청 간 공유하는 비동기 커넥션 풀)
 client = None
 if os.getenv("OPENAI_API_KEY"):
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+    client = AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+    )
+
+STORYBOARD_MODEL = "gpt-4-turbo-preview"
+STORYBOARD_CALL_COST = 0.15  # GPT-4 콘티 생성 호출 1회당 비용
+
+# 씬 분할 생성 (options.storyboard_mode: single, scenes, auto)
+STORYBOARD_MODES = ("single", "scenes", "auto")
+SCENE_HEADER = "## 씬"
+SCENE_CONCURRENCY = int(os.getenv("DIRECTOR_SCENE_CONCURRENCY", "8"))
+SCENE_AUTO_MIN_PANELS = int(os.getenv("DIRECTOR_SCENE_AUTO_MIN_PANELS", "24"))  # auto: 이 패널 수 이상이면 씬 분할
+
+# 콘티 결과 캐시 (같은 시나리오/장르/톤/패널 수/스타일/모델이면 GPT 호출 없이 재사용)
+STORYBOARD_CACHE_PATH = os.getenv(
+    "DIRECTOR_CACHE_PATH",
+    os.path.join(os.getenv("IMAGE_STORAGE_DIR", "/var/www/toonverse/webapp/storage/images"), "cache", "storyboards.sqlite3")
+)
+STORYBOARD_CACHE_TTL_HOURS = float(os.getenv("DIRECTOR_CACHE_TTL_HOURS", "168"))
+STORYBOARD_CACHE_MAX_ENTRIES = int(os.getenv("DIRECTOR_CACHE_MAX_ENTRIES", "1000"))
+STORYBOARD_CACHE_MAX_MB = float(os.getenv("DIRECTOR_CACHE_MAX_MB", "64"))
+
+storyboard_cache = JsonCache(
+    STORYBOARD_CACHE_PATH,
+    ttl_seconds=STORYBOARD_CACHE_TTL_HOURS * 3600,
+    max_entries=STORYBOARD_CACHE_MAX_ENTRIES,
+    max_bytes=int(STORYBOARD_CACHE_MAX_MB * 1024 * 1024)
+)
 
 class PanelInfo(BaseModel):
     panel_number: int
@@ -50,6 +98,12 @@ class DirectorResponse(BaseModel):
     result: Dict[str, Any]
     metadata: Dict[str, Any]
 
+@app.on_event("shutdown")
+async def close_client():
+    if client:
+        await client.close()
+    storyboard_cache.close()
+
 @app.get("/")
 def root():
     """
@@ -73,23 +127,38 @@ def health_check():
         "status": "healthy",
         "service": "director_engine",
         "openai_api": openai_status,
+        "storyboard_cache": storyboard_cache.stats(),
+        "jobs": jobs.stats(),
         "timestamp": datetime.now().isoformat(),
         "endpoints": [
             "/",
             "/health",
-            "/engine/director/storyboard"
+            "/engine/director/storyboard",
+            "/engine/director/storyboard/stream",
+            *jobs.endpoints("/engine/director"),
+            "/metrics"
         ]
     }
 
 @app.post("/engine/director/storyboard", response_model=DirectorResponse)
-def create_storyboard(request: DirectorRequest):
+async def create_storyboard(request: DirectorRequest):
     """
     시나리오를 패널 단위 컷 리스트로 변환
     
     입력: 시나리오 텍스트
     출력: 패널별 비주얼 지시서 (JSON)
     """
+    # inputs/options는 null로 올 수 있음
+    inputs = request.inputs or {}
+    options = request.options or {}
+    if options.get('storyboard_mode', 'single') not in STORYBOARD_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"storyboard_mode must be one of: {', '.join(STORYBOARD_MODES)}"
+        )
+    
     start_time = time.time()
+    begin_trace("director.storyboard", options.get('trace'))
     
     try:
         # 입력 파라미터 추출
@@ -98,14 +167,31 @@ def create_storyboard(request: DirectorRequest):
         genre = request.project.get('genre', 'Unknown')
         tone = request.project.get('tone', 'serious')
         
-        target_panels = request.inputs.get('target_panels', 15)
-        style = request.options.get('style', 'webtoon')
+        target_panels = inputs.get('target_panels', 15)
+        style = options.get('style', 'webtoon')
         
         if not script_text:
             raise HTTPException(status_code=400, detail="script_text is required")
         
-        # OpenAI API 호출
-        if not client:
+        storyboard_mode = resolve_storyboard_mode(
+            options.get('storyboard_mode', 'single'),
+            script_text,
+            target_panels
+        )
+        
+        # 같은 입력으로 생성한 콘티가 있으면 재사용 (실패한 파이프라인 재실행 등)
+        cache_key = storyboard_cache.make_key(
+            STORYBOARD_MODEL, storyboard_mode, script_text, project_title, genre, tone, target_panels, style
+        )
+        cached_panels = None
+        if client and not options.get('bypass_cache'):
+            cached_panels = await run_in_threadpool(storyboard_cache.get, cache_key)
+        
+        # OpenAI API 호출 (비용은 실제 호출 횟수 기준, 씬 분할은 씬마다 1회)
+        gpt_calls = 0
+        if cached_panels is not None:
+            panels = cached_panels
+        elif not client:
             # MVP: 더미 데이터 (OpenAI API 키 없을 때)
             panels = generate_dummy_storyboard(
                 script_text, 
@@ -113,15 +199,29 @@ def create_storyboard(request: DirectorRequest):
                 genre,
                 tone
             )
+        elif storyboard_mode == "scenes":
+            # 씬별로 나눠 동시에 생성 후 병합
+            gpt_calls = len(split_scenes(script_text))
+            panels = await generate_storyboard_by_scenes(
+                script_text,
+                project_title,
+                genre,
+                tone,
+                target_panels,
+                style,
+                cache_key
+            )
         else:
             # Production: 실제 GPT-4 호출
-            panels = generate_storyboard_with_gpt4(
+            gpt_calls = 1
+            panels = await generate_storyboard_with_gpt4(
                 script_text,
                 project_title,
                 genre,
                 tone,
                 target_panels,
-                style
+                style,
+                cache_key
             )
         
         processing_time = time.time() - start_time
@@ -135,28 +235,265 @@ def create_storyboard(request: DirectorRequest):
             },
             metadata={
                 "engine_version": "1.0.0",
-                "cost_units": 0.15 if client else 0.0,  # GPT-4 비용
+                "cost_units": round(STORYBOARD_CALL_COST * gpt_calls, 2),  # GPT-4 비용
                 "processing_time": round(processing_time, 2),
                 "model": "gpt-4" if client else "dummy",
-                "warnings": [] if client else ["Using dummy data - OPENAI_API_KEY not configured"]
+                "cache_hit": cached_panels is not None,
+                "storyboard_mode": storyboard_mode,
+                "scene_chunks": len(split_scenes(script_text)) if storyboard_mode == "scenes" else 1,
+                "warnings": [] if client else ["Using dummy data - OPENAI_API_KEY not configured"],
+                **trace_metadata()
             }
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def generate_storyboard_with_gpt4(
+@app.post("/engine/director/storyboard/stream")
+async def create_storyboard_stream(request: DirectorRequest, format: str = "ndjson"):
+    """
+    시나리오를 패널 단위 컷 리스트로 변환 (스트리밍)
+    
+    GPT-4 스트리밍 응답에서 패널 객체가 완성되는 즉시 한 건씩 내보내고,
+    마지막에 비용/소요 시간 요약을 보낸다. 앞 패널의 이미지 생성을 먼저 시작할 수 있다.
+    format: ndjson (기본) 또는 sse
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    
+    # inputs/options는 null로 올 수 있음
+    inputs = request.inputs or {}
+    options = request.options or {}
+    script_text = request.episode.get('script_text', '')
+    if not script_text:
+        raise HTTPException(status_code=400, detail="script_text is required")
+    
+    project_title = request.project.get('title', 'Unknown')
+    genre = request.project.get('genre', 'Unknown')
+    tone = request.project.get('tone', 'serious')
+    target_panels = inputs.get('target_panels', 15)
+    style = options.get('style', 'webtoon')
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    
+    def encode(event: str, data: Dict[str, Any]) -> str:
+        if format == "sse":
+            return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        return json.dumps({"type": event, **data}, ensure_ascii=False) + "\n"
+    
+    async def event_stream():
+        start_time = time.time()
+        begin_trace("director.storyboard.stream", options.get('trace'))
+        emitted = []
+        warnings = []
+        
+        def panel_event(panel: Dict[str, Any]) -> str:
+            panel["panel_number"] = len(emitted) + 1
+            emitted.append(panel)
+            return encode("panel", {"panel": panel, "emitted": len(emitted), "target_panels": target_panels})
+        
+        # 한 번에 생성하는 경로와 같은 캐시 키 (스트리밍 결과도 공유)
+        cache_key = storyboard_cache.make_key(
+            STORYBOARD_MODEL, "single", script_text, project_title, genre, tone, target_panels, style
+        )
+        cached_panels = None
+        if client and not options.get('bypass_cache'):
+            cached_panels = await run_in_threadpool(storyboard_cache.get, cache_key)
+        
+        if cached_panels is not None:
+            for panel in cached_panels:
+                yield panel_event(panel)
+        elif not client:
+            warnings.append("Using dummy data - OPENAI_API_KEY not configured")
+            for panel in generate_dummy_storyboard(script_text, target_panels, genre, tone):
+                yield panel_event(panel)
+        else:
+            try:
+                async for panel in stream_storyboard_panels(
+                    script_text,
+                    project_title,
+                    genre,
+                    tone,
+                    target_panels,
+                    style
+                ):
+                    yield panel_event(panel)
+                await run_in_threadpool(storyboard_cache.put, cache_key, emitted)
+            except Exception as e:
+                print(f"GPT-4 API Error: {e}")
+                yield encode("error", {"detail": str(e), "emitted": len(emitted)})
+                if not emitted:
+                    # 패널을 하나도 못 받았으면 한 번에 생성하는 경로처럼 더미 데이터로 폴백
+                    warnings.append("GPT-4 stream failed - using dummy data")
+                    for panel in generate_dummy_storyboard(script_text, target_panels, genre, tone):
+                        yield panel_event(panel)
+        
+        yield encode("summary", {
+            "success": len(emitted) > 0,
+            "total_panels": len(emitted),
+            "estimated_duration": len(emitted) * 3,  # 패널당 3초 예상
+            "metadata": {
+                "engine_version": "1.0.0",
+                "cost_units": STORYBOARD_CALL_COST if client and cached_panels is None else 0.0,  # GPT-4 비용
+                "processing_time": round(time.time() - start_time, 2),
+                "model": "gpt-4" if client else "dummy",
+                "cache_hit": cached_panels is not None,
+                "warnings": warnings,
+                **trace_metadata()
+            }
+        })
+    
+    return StreamingResponse(event_stream(), media_type=media_type)
+
+async def generate_storyboard_with_gpt4(
     script_text: str,
     project_title: str,
     genre: str,
     tone: str,
     target_panels: int,
-    style: str
+    style: str,
+    cache_key: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     GPT-4를 사용하여 시나리오를 컷 리스트로 변환
+    
+    cache_key가 있으면 정상 응답만 캐시에 저장 (더미 폴백 결과는 저장하지 않음)
+    """
+    try:
+        panels = await request_storyboard_panels(
+            script_text,
+            project_title,
+            genre,
+            tone,
+            target_panels,
+            style
+        )
+        
+        if cache_key:
+            await run_in_threadpool(storyboard_cache.put, cache_key, panels)
+        
+        return panels
+        
+    except Exception as e:
+        print(f"GPT-4 API Error: {e}")
+        # 에러 발생 시 더미 데이터로 폴백
+        return generate_dummy_storyboard(script_text, target_panels, genre, tone)
+
+async def generate_storyboard_by_scenes(
+    script_text: str,
+    project_title: str,
+    genre: str,
+    tone: str,
+    target_panels: int,
+    style: str,
+    cache_key: Optional[str] = None
+) -> List[Dict[str, Any]]:
     """
+    시나리오를 씬 헤더(## 씬) 단위로 나눠 씬별 컷 리스트를 동시에 생성하고 병합
+    
+    씬별 패널 수는 씬 분량에 비례해 배분하고, 병합 후 panel_number를 1부터 다시 매긴다.
+    실패한 씬만 더미 데이터로 채우며, 이 경우 결과를 캐시에 저장하지 않음
+    """
+    chunks = split_scenes(script_text)
+    budgets = allocate_scene_panels(chunks, target_panels)
+    semaphore = asyncio.Semaphore(SCENE_CONCURRENCY)
+    
+    async def generate_scene(chunk: str, budget: int) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await request_storyboard_panels(chunk, project_title, genre, tone, budget, style)
+    
+    results = await asyncio.gather(
+        *(generate_scene(chunk, budget) for chunk, budget in zip(chunks, budgets)),
+        return_exceptions=True
+    )
     
+    panels = []
+    failed_scenes = 0
+    for chunk, budget, result in zip(chunks, budgets, results):
+        if isinstance(result, BaseException):
+            print(f"GPT-4 API Error: {result}")
+            failed_scenes += 1
+            result = generate_dummy_storyboard(chunk, budget, genre, tone)
+        panels.extend(result)
+    
+    for index, panel in enumerate(panels):
+        panel["panel_number"] = index + 1
+    
+    if cache_key and not failed_scenes:
+        await run_in_threadpool(storyboard_cache.put, cache_key, panels)
+    
+    return panels
+
+async def request_storyboard_panels(
+    script_text: str,
+    project_title: str,
+    genre: str,
+    tone: str,
+    target_panels: int,
+    style: str
+) -> List[Dict[str, Any]]:
+    """
+    GPT-4 호출 한 번으로 컷 리스트 생성 (실패 시 예외 발생)
+    """
+    with track_provider("openai", "chat.completions"):
+        response = await client.chat.completions.create(
+            model=STORYBOARD_MODEL,
+            messages=build_storyboard_messages(script_text, project_title, genre, tone, target_panels, style),
+            response_format={"type": "json_object"},
+            temperature=0.7,
+            max_tokens=4000
+        )
+    
+    result_text = response.choices[0].message.content
+    return extract_panels(json.loads(result_text))
+
+async def stream_storyboard_panels(
+    script_text: str,
+    project_title: str,
+    genre: str,
+    tone: str,
+    target_panels: int,
+    style: str
+):
+    """
+    GPT-4 스트리밍 호출로 컷 리스트 생성, 패널 객체가 완성될 때마다 하나씩 반환
+    """
+    parser = PanelStreamParser()
+    
+    # 지연은 첫 요청부터 스트림 종료까지 (소비 측 처리 시간 포함)
+    with track_provider("openai", "chat.completions.stream"):
+        stream = await client.chat.completions.create(
+            model=STORYBOARD_MODEL,
+            messages=build_storyboard_messages(script_text, project_title, genre, tone, target_panels, style),
+            response_format={"type": "json_object"},
+            temperature=0.7,
+            max_tokens=4000,
+            stream=True
+        )
+        
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                for panel in parser.feed(delta):
+                    yield panel
+    
+    # 배열 없이 객체 하나로 응답한 경우 등 증분 파싱으로 못 꺼낸 나머지
+    for panel in parser.finish():
+        yield panel
+
+def build_storyboard_messages(
+    script_text: str,
+    project_title: str,
+    genre: str,
+    tone: str,
+    target_panels: int,
+    style: str
+) -> List[Dict[str, str]]:
+    """
+    콘티 생성 프롬프트 (시스템 + 사용자 메시지)
+    """
     system_prompt = f"""당신은 전문 웹툰 연출가입니다.
 주어진 시나리오를 {target_panels}개의 패널로 나누고, 각 패널의 상세한 비주얼 지시서를 작성하세요.
 
@@ -183,34 +520,136 @@ JSON 배열로 응답하세요."""
 {script_text}
 
 위 시나리오를 {target_panels}개의 패널로 나누고, 각 패널의 비주얼 지시서를 JSON 형식으로 작성하세요."""
+    
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.7,
-            max_tokens=4000
-        )
-        
-        result_text = response.choices[0].message.content
-        result_json = json.loads(result_text)
+def extract_panels(result_json: Any) -> List[Dict[str, Any]]:
+    """
+    panels 키가 있으면 추출, 없으면 전체를 panels로 간주
+    """
+    if isinstance(result_json, dict) and "panels" in result_json:
+        return result_json["panels"]
+    return result_json if isinstance(result_json, list) else [result_json]
+
+class PanelStreamParser:
+    """
+    스트리밍으로 들어오는 JSON 텍스트에서 패널 객체를 완성되는 순서대로 꺼내는 증분 파서
+    
+    패널 배열({"panels": [...]} 또는 최상위 [...])의 원소 객체가 닫히는 순간
+    그 구간만 json.loads 한다. 문자열 안의 괄호와 이스케이프는 무시한다.
+    """
+    
+    def __init__(self):
+        self.buffer = []
+        self.stack = []
+        self.in_string = False
+        self.escaped = False
+        self.string_chars = []
+        self.last_string = None  # 직전에 닫힌 문자열 (배열 앞의 키 확인용)
+        self.array_depth = None
+        self.object_chars = None  # 현재 읽는 패널 객체 텍스트
+        self.emitted = 0
+    
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        panels = []
+        self.buffer.append(text)
         
-        # panels 키가 있으면 추출, 없으면 전체를 panels로 간주
-        if "panels" in result_json:
-            panels = result_json["panels"]
-        else:
-            panels = result_json if isinstance(result_json, list) else [result_json]
+        for char in text:
+            if self.object_chars is not None:
+                self.object_chars.append(char)
+            
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    self.last_string = "".join(self.string_chars)
+                    continue
+                self.string_chars.append(char)
+            elif char == '"':
+                self.in_string = True
+                self.string_chars = []
+            elif char in "[{":
+                self.stack.append(char)
+                if char == "[" and self.array_depth is None and (len(self.stack) == 1 or self.last_string == "panels"):
+                    self.array_depth = len(self.stack)
+                elif char == "{" and self.array_depth is not None and len(self.stack) == self.array_depth + 1:
+                    self.object_chars = [char]
+            elif char in "]}":
+                if self.stack:
+                    self.stack.pop()
+                if char == "}" and self.object_chars is not None and len(self.stack) == self.array_depth:
+                    panels.append(json.loads("".join(self.object_chars)))
+                    self.object_chars = None
         
+        self.emitted += len(panels)
         return panels
-        
-    except Exception as e:
-        print(f"GPT-4 API Error: {e}")
-        # 에러 발생 시 더미 데이터로 폴백
-        return generate_dummy_storyboard(script_text, target_panels, genre, tone)
+    
+    def finish(self) -> List[Dict[str, Any]]:
+        """
+        스트림 종료 후 아직 내보내지 않은 패널 반환 (전체 응답을 한 번에 파싱)
+        """
+        panels = extract_panels(json.loads("".join(self.buffer)))
+        return panels[self.emitted:]
+
+def resolve_storyboard_mode(mode: str, script_text: str, target_panels: int) -> str:
+    """
+    요청 모드를 실제 생성 방식(single, scenes)으로 결정
+    
+    씬이 2개 미만이거나 패널 수가 씬 수보다 적으면 씬 분할 없이 한 번에 생성
+    """
+    if mode not in STORYBOARD_MODES:
+        raise ValueError(f"Unknown storyboard_mode: {mode}")
+    
+    scene_count = len(split_scenes(script_text))
+    if mode == "single" or scene_count < 2 or target_panels < scene_count:
+        return "single"
+    if mode == "auto" and target_panels < SCENE_AUTO_MIN_PANELS:
+        return "single"
+    return "scenes"
+
+def split_scenes(script_text: str) -> List[str]:
+    """
+    시나리오를 씬 헤더(## 씬) 기준으로 분할 (첫 헤더 앞 내용은 첫 씬에 포함)
+    """
+    chunks = []
+    current = []
+    for line in script_text.split('\n'):
+        if line.startswith(SCENE_HEADER) and any(l.startswith(SCENE_HEADER) for l in current):
+            chunks.append('\n'.join(current).strip())
+            current = []
+        current.append(line)
+    chunks.append('\n'.join(current).strip())
+    
+    return [chunk for chunk in chunks if chunk]
+
+def allocate_scene_panels(chunks: List[str], target_panels: int) -> List[int]:
+    """
+    씬 분량(글자 수)에 비례해 패널 수 배분 (씬마다 최소 1개, 합계는 target_panels)
+    """
+    budgets = [1] * len(chunks)
+    remaining = target_panels - len(chunks)
+    if remaining <= 0:
+        return budgets
+    
+    weights = [max(1, len(chunk)) for chunk in chunks]
+    total_weight = sum(weights)
+    shares = [remaining * weight / total_weight for weight in weights]
+    for index, share in enumerate(shares):
+        budgets[index] += int(share)
+    
+    # 나머지는 소수점 이하가 큰 씬부터 하나씩
+    leftover = target_panels - sum(budgets)
+    by_fraction = sorted(range(len(chunks)), key=lambda i: shares[i] - int(shares[i]), reverse=True)
+    for index in by_fraction[:leftover]:
+        budgets[index] += 1
+    
+    return budgets
 
 def generate_dummy_storyboard(
     script_text: str,
@@ -254,6 +693,18 @@ def generate_dummy_storyboard(
     
     return panels
 
+# 비동기 작업 API (POST 즉시 job_id 반환, GET으로 상태/진행률/결과 조회)
+jobs = JobManager("director")
+jobs.register("storyboard", create_storyboard, DirectorRequest)
+jobs.install(app, "/engine/director")
+
+# Prometheus 메트릭 (요청/외부 API 지연, 캐시, 작업 큐)
+metrics = install_metrics(app, "director", jobs)
+metrics.add_collector(lambda: cache_samples("storyboard", storyboard_cache.stats()))
+
+# 단계별 구간 추적 (X-Toonverse-Trace 헤더 또는 options.trace 플래그)
+install_tracing(app)
+
 if __name__ == "__main__":
     print("=" * 60)
     print("🎬 TOONVERSE Director Engine Starting...")
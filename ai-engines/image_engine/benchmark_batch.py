@@ -0,0 +1,117 @@
+"""
+배치 이미지 생성 벤치마크
+
+로컬 스텁 이미지 프로바이더(지연 시간을 흉내내는 images.generate + PNG를 내려주는
+로컬 HTTP 서버)를 붙여서 패널 수 N에 대해 동시 실행 한도별 소요 시간을 측정한다.
+
+    python benchmark_batch.py --panels 15 --latency 0.5 --concurrency 1,2,4,8,16
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from types import SimpleNamespace
+
+# main 임포트 전에 저장 경로를 임시 디렉토리로 돌린다
+os.environ["IMAGE_STORAGE_DIR"] = tempfile.mkdtemp(prefix="toonverse_bench_")
+os.environ.pop("OPENAI_API_KEY", None)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image  # noqa: E402
+
+import main  # noqa: E402
+
+
+def make_png_bytes(width: int = 1024, height: int = 1792) -> bytes:
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (200, 200, 255)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def start_stub_server(png_bytes: bytes) -> ThreadingHTTPServer:
+    """생성된 이미지 URL 역할을 하는 로컬 HTTP 서버"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(png_bytes)))
+            self.end_headers()
+            self.wfile.write(png_bytes)
+
+        def log_message(self, format, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        request_queue_size = 128
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class StubImages:
+    def __init__(self, url: str, latency: float):
+        self.url = url
+        self.latency = latency
+
+    async def generate(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(data=[SimpleNamespace(url=self.url)])
+
+
+def run(panels: int, latency: float, concurrency_levels, width: int, height: int):
+    server = start_stub_server(make_png_bytes(width, height))
+    url = f"http://127.0.0.1:{server.server_address[1]}/image.png"
+    main.client = SimpleNamespace(images=StubImages(url, latency))
+    # get_batch_concurrency가 IMAGE_BATCH_CONCURRENCY로 상한을 두므로 측정할 최대값까지 올림
+    main.BATCH_MAX_CONCURRENCY = max(concurrency_levels)
+
+    request = main.ImageEngineRequest(
+        episode_id=1,
+        panels=[
+            main.ImageRequest(panel_number=i + 1, visual_prompt=f"panel {i + 1}")
+            for i in range(panels)
+        ],
+    )
+
+    print(f"panels={panels} provider_latency={latency}s image={width}x{height}")
+    print(f"{'concurrency':>12} {'wall_s':>8} {'speedup':>8}")
+    baseline = None
+    for limit in concurrency_levels:
+        request.options = {"max_concurrency": limit, "bypass_cache": True}
+        start = time.perf_counter()
+        response = asyncio.run(main.generate_batch_images(request))
+        elapsed = time.perf_counter() - start
+
+        numbers = [img["panel_number"] for img in response.result["images"]]
+        assert numbers == list(range(1, panels + 1)), "results out of panel order"
+
+        baseline = baseline or elapsed
+        print(f"{limit:>12} {elapsed:>8.2f} {baseline / elapsed:>7.1f}x")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Image engine batch concurrency benchmark")
+    parser.add_argument("--panels", type=int, default=15)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub provider latency per image (s)")
+    parser.add_argument("--concurrency", default="1,2,4,8,16")
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--height", type=int, default=1792)
+    args = parser.parse_args()
+
+    run(
+        args.panels,
+        args.latency,
+        [int(c) for c in args.concurrency.split(",")],
+        args.width,
+        args.height,
+    )
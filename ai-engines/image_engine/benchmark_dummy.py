@@ -0,0 +1,70 @@
+"""
+더미 이미지 생성 처리량 벤치마크
+
+API 키 없이(더미 모드) /engine/image/generate-batch 경로로 패널 N개를 생성해
+초당 패널 수를 측정한다. cold는 PNG 인코딩 캐시를 비운 상태, warm은 같은 배치를 다시 돌린 경우.
+
+    python benchmark_dummy.py --panels 200 --compress-levels 6,1
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# main 임포트 전에 저장 경로를 임시 디렉토리로 돌린다
+os.environ["IMAGE_STORAGE_DIR"] = tempfile.mkdtemp(prefix="toonverse_bench_")
+os.environ.pop("OPENAI_API_KEY", None)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main  # noqa: E402
+
+
+def run_batch(episode_id: int, panels: int, width: int, height: int, concurrency: int):
+    request = main.ImageEngineRequest(
+        episode_id=episode_id,
+        panels=[
+            main.ImageRequest(panel_number=i + 1, visual_prompt="benchmark", width=width, height=height)
+            for i in range(panels)
+        ],
+        options={"max_concurrency": concurrency},
+    )
+    start = time.perf_counter()
+    response = asyncio.run(main.generate_batch_images(request))
+    elapsed = time.perf_counter() - start
+    return elapsed, response.result
+
+
+def run(panels: int, width: int, height: int, concurrency: int, compress_levels):
+    print(f"panels={panels} size={width}x{height} concurrency={concurrency}")
+    print(f"{'level':>6} {'run':>5} {'wall_s':>8} {'panels/s':>9} {'total_mb':>9} {'unique_files':>13}")
+    episode_id = 0
+    for level in compress_levels:
+        main.DUMMY_PNG_COMPRESS_LEVEL = level
+        main.render_dummy_png.cache_clear()
+        for label in ("cold", "warm"):
+            episode_id += 1
+            elapsed, result = run_batch(episode_id, panels, width, height, concurrency)
+            files = {image["image_url"] for image in result["images"]}
+            total_mb = sum(os.path.getsize(path) for path in files) / (1024 * 1024)
+            print(f"{level:>6} {label:>5} {elapsed:>8.2f} {panels / elapsed:>9.1f} "
+                  f"{total_mb:>9.1f} {len(files):>13}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dummy image generation throughput benchmark")
+    parser.add_argument("--panels", type=int, default=200)
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--height", type=int, default=1448)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--compress-levels", default="6,1")
+    args = parser.parse_args()
+
+    run(
+        args.panels,
+        args.width,
+        args.height,
+        args.concurrency,
+        [int(level) for level in args.compress_levels.split(",")],
+    )
@@ -1,17 +1,38 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 import os
+import sys
+import json
+import asyncio
 import time
 import base64
+import hashlib
+import shutil
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import httpx
 from datetime import datetime
-from openai import OpenAI
-from PIL import Image
+from functools import lru_cache
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from PIL import Image, ImageDraw, ImageFont
 from io import BytesIO
 from pathlib import Path
 
+# 공통 모듈 (ai-engines 디렉토리 기준 임포트)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.assets import asset_endpoint, install_asset_routes  # noqa: E402
+from common.jobs import JobManager, report_progress  # noqa: E402
+from common.metrics import cache_samples, install_metrics, track_provider  # noqa: E402
+from common.storage import AssetStorage  # noqa: E402
+from common.tracing import begin_trace, install_tracing, span, trace_metadata  # noqa: E402
+
 # Load .env file from backend-api
 def load_env_file():
     env_path = Path(__file__).parent.parent.parent / "backend-api" / ".env"
@@ -40,12 +61,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# OpenAI 클라이언트 초기화
+# OpenAI 클라이언트 초기화 (요청 간 공유하는 비동기 커넥션 풀)
 api_key = os.getenv("OPENAI_API_KEY")
 client = None
 if api_key:
     print(f"🔑 OpenAI API Key found (length: {len(api_key)})")
-    client = OpenAI(api_key=api_key)
+    max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+    client = AsyncOpenAI(
+        api_key=api_key,
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+    )
     print("✅ OpenAI Client initialized successfully")
 else:
     print("❌ OPENAI_API_KEY not found in environment")
@@ -54,6 +84,52 @@ else:
 STORAGE_DIR = os.getenv("IMAGE_STORAGE_DIR", "/var/www/toonverse/webapp/storage/images")
 os.makedirs(STORAGE_DIR, exist_ok=True)
 
+# 생성 패널은 내용 주소로 저장 (같은 바이트는 파일 하나, 에피소드 간 충돌 없음)
+storage = AssetStorage(STORAGE_DIR)
+
+# 배치 생성 시 동시에 진행할 최대 패널 수 (options.max_concurrency로 요청별로 낮출 수 있음, 상한은 이 값)
+BATCH_MAX_CONCURRENCY = int(os.getenv("IMAGE_BATCH_CONCURRENCY", "4"))
+
+# 생성 캐시 (강화 프롬프트가 같으면 OpenAI 재호출 없이 저장된 이미지 재사용)
+CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(STORAGE_DIR, "cache"))
+CACHE_MAX_MB = float(os.getenv("IMAGE_CACHE_MAX_MB", "2048"))
+
+# 생성 이미지 다운로드 설정
+DOWNLOAD_CONNECT_TIMEOUT = float(os.getenv("IMAGE_DOWNLOAD_CONNECT_TIMEOUT", "5"))
+DOWNLOAD_READ_TIMEOUT = float(os.getenv("IMAGE_DOWNLOAD_READ_TIMEOUT", "60"))
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# 더미 이미지 설정 (부하 테스트 시 IMAGE_DUMMY_COMPRESS_LEVEL=1로 인코딩 비용 절감)
+DUMMY_PNG_COMPRESS_LEVEL = int(os.getenv("IMAGE_DUMMY_COMPRESS_LEVEL", "6"))
+DUMMY_PNG_CACHE_SIZE = int(os.getenv("IMAGE_DUMMY_CACHE_SIZE", "256"))
+DUMMY_COLORS = [
+    (255, 200, 200),  # 연한 빨강
+    (200, 255, 200),  # 연한 초록
+    (200, 200, 255),  # 연한 파랑
+    (255, 255, 200),  # 연한 노랑
+    (255, 200, 255),  # 연한 보라
+]
+
+def create_download_session() -> requests.Session:
+    """
+    keep-alive 연결을 재사용하는 공유 다운로드 세션 (일시 오류는 재시도)
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"]
+    )
+    pool_size = max(10, BATCH_MAX_CONCURRENCY * 2)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+download_session = create_download_session()
+
 class CharacterRef(BaseModel):
     name: str
     reference_image_url: Optional[str] = None
@@ -68,6 +144,9 @@ class ImageRequest(BaseModel):
     style: str = "webtoon"
     width: int = 1024
     height: int = 1448
+    seed: Optional[str] = None  # 같은 프롬프트의 다른 변형을 원할 때 캐시 키를 구분
+    bypass_cache: bool = False
+    trace: bool = False  # generate: 단계별 소요 시간을 metadata.timings로 반환 (배치는 options.trace)
 
 class ImageEngineRequest(BaseModel):
     episode_id: int
@@ -86,6 +165,129 @@ class ImageEngineResponse(BaseModel):
     result: Dict[str, Any]
     metadata: Dict[str, Any]
 
+class ImageCache:
+    """
+    생성 결과 디스크 캐시
+    
+    (model, size, quality, 강화 프롬프트, seed) 해시를 키로 PNG를 보관하고,
+    전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (mtime 기준 LRU)
+    """
+    
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._entries = {
+            path: os.path.getsize(path) for path in self._scan()
+        }
+        self._total_bytes = sum(self._entries.values())
+    
+    @staticmethod
+    def make_key(model: str, size: str, quality: str, prompt: str, seed: Optional[str]) -> str:
+        payload = json.dumps([model, size, quality, prompt, seed], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.png")
+    
+    def _scan(self) -> List[str]:
+        paths = []
+        for root, _, files in os.walk(self.cache_dir):
+            paths.extend(os.path.join(root, name) for name in files if name.endswith(".png"))
+        return paths
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        캐시된 PNG 경로 (없으면 None)
+        
+        돌려준 뒤에도 다른 요청의 eviction이나 다른 워커 프로세스가 파일을 지울 수 있으므로
+        호출 쪽은 FileNotFoundError를 받으면 invalidate 후 미스로 처리
+        """
+        path = self._path(key)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                self._total_bytes -= self._entries.pop(path, 0)
+                self.misses += 1
+                return None
+            if path not in self._entries:
+                # 다른 워커 프로세스가 저장한 항목
+                self._entries[path] = size
+                self._total_bytes += size
+            self.hits += 1
+        try:
+            os.utime(path)  # LRU 갱신
+        except FileNotFoundError:
+            self.invalidate(key)
+            return None
+        return path
+    
+    def invalidate(self, key: str):
+        """
+        get()이 돌려준 뒤 사라진 항목 정리 (히트를 미스로 정정)
+        """
+        with self._lock:
+            self._total_bytes -= self._entries.pop(self._path(key), 0)
+            self.hits -= 1
+            self.misses += 1
+    
+    def put(self, key: str, source_path: str) -> str:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        link_or_copy(source_path, tmp_path)
+        os.replace(tmp_path, path)
+        
+        with self._lock:
+            self._total_bytes -= self._entries.get(path, 0)
+            self._entries[path] = os.path.getsize(path)
+            self._total_bytes += self._entries[path]
+            self._evict()
+        return path
+    
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        by_mtime = sorted(
+            self._entries,
+            key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0
+        )
+        for path in by_mtime:
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._total_bytes -= self._entries.pop(path)
+            self.evictions += 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "cache_dir": self.cache_dir,
+            "entries": len(self._entries),
+            "size_mb": round(self._total_bytes / (1024 * 1024), 2),
+            "max_size_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+generation_cache = ImageCache(CACHE_DIR, int(CACHE_MAX_MB * 1024 * 1024))
+
+@app.on_event("shutdown")
+async def close_clients():
+    if client:
+        await client.close()
+    download_session.close()
+
 @app.get("/")
 def root():
     """Health check endpoint"""
@@ -108,29 +310,32 @@ def health_check():
         "openai_api": openai_status,
         "storage_dir": STORAGE_DIR,
         "storage_writable": storage_writable,
+        "generation_cache": generation_cache.stats(),
+        "asset_storage": storage.stats(),
+        "jobs": jobs.stats(),
         "timestamp": datetime.now().isoformat(),
         "endpoints": [
             "/",
             "/health",
             "/engine/image/generate",
-            "/engine/image/generate-batch"
+            "/engine/image/generate-batch",
+            "/engine/image/generate-batch/stream",
+            *jobs.endpoints("/engine/image"),
+            asset_endpoint("/engine/image"),
+            "/metrics"
         ]
     }
 
 @app.post("/engine/image/generate", response_model=ImageEngineResponse)
-def generate_single_image(request: ImageRequest):
+async def generate_single_image(request: ImageRequest):
     """
     단일 패널 이미지 생성
     """
     start_time = time.time()
+    begin_trace("image.generate", request.trace)
     
     try:
-        if not client:
-            # MVP: 더미 이미지 (OpenAI API 키 없을 때)
-            result = generate_dummy_image(request)
-        else:
-            # Production: DALL-E 3 호출
-            result = generate_image_with_dalle3(request)
+        result = await generate_panel_image(request)
         
         processing_time = time.time() - start_time
         
@@ -141,34 +346,43 @@ def generate_single_image(request: ImageRequest):
                 "engine_version": "1.0.0",
                 "cost_units": 0.04 if client else 0.0,  # DALL-E 3 비용
                 "processing_time": round(processing_time, 2),
-                "model": "dall-e-3" if client else "dummy"
+                "model": "dall-e-3" if client else "dummy",
+                **trace_metadata()
             }
         )
-        
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/engine/image/generate-batch", response_model=ImageEngineResponse)
-def generate_batch_images(request: ImageEngineRequest):
+async def generate_batch_images(request: ImageEngineRequest):
     """
     여러 패널 이미지 일괄 생성
     """
     start_time = time.time()
     
     try:
-        results = []
-        total_cost = 0.0
+        max_concurrency = get_batch_concurrency(request.options)
+        begin_trace("image.generate-batch", (request.options or {}).get("trace"))
         
-        for panel_request in request.panels:
-            if not client:
-                # MVP: 더미 이미지
-                result = generate_dummy_image(panel_request)
-            else:
-                # Production: DALL-E 3 호출
-                result = generate_image_with_dalle3(panel_request)
-            
-            results.append(result)
-            total_cost += result.get('generation_metadata', {}).get('cost', 0.04)
+        # 패널별 생성을 동시에 진행하되, 결과는 패널 순서대로 반환
+        semaphore = asyncio.Semaphore(max_concurrency)
+        panels = get_batch_panels(request)
+        completed = 0
+        
+        async def generate_limited(panel_request: ImageRequest) -> Dict[str, Any]:
+            nonlocal completed
+            async with semaphore:
+                result = await generate_panel_image(panel_request)
+            completed += 1
+            report_progress(completed, len(panels))
+            return result
+        
+        results = await asyncio.gather(
+            *(generate_limited(panel_request) for panel_request in panels)
+        )
+        
+        total_cost = sum(r.get('generation_metadata', {}).get('cost', 0.04) for r in results)
         
         processing_time = time.time() - start_time
         
@@ -185,14 +399,123 @@ def generate_batch_images(request: ImageEngineRequest):
                 "cost_units": total_cost,
                 "processing_time": round(processing_time, 2),
                 "model": "dall-e-3" if client else "dummy",
-                "warnings": [] if client else ["Using dummy images - OPENAI_API_KEY not configured"]
+                "max_concurrency": max_concurrency,
+                "warnings": [] if client else ["Using dummy images - OPENAI_API_KEY not configured"],
+                **trace_metadata()
             }
         )
-        
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def generate_image_with_dalle3(request: ImageRequest) -> Dict[str, Any]:
+@app.post("/engine/image/generate-batch/stream")
+async def generate_batch_images_stream(request: ImageEngineRequest, format: str = "ndjson"):
+    """
+    여러 패널 이미지 일괄 생성 (스트리밍)
+    
+    패널이 저장되는 즉시 완료 순서대로 결과를 한 건씩 내보내고,
+    마지막에 비용/소요 시간 요약을 보낸다.
+    format: ndjson (기본) 또는 sse
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    
+    max_concurrency = get_batch_concurrency(request.options)
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    
+    def encode(event: str, data: Dict[str, Any]) -> str:
+        if format == "sse":
+            return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        return json.dumps({"type": event, **data}, ensure_ascii=False) + "\n"
+    
+    async def event_stream():
+        start_time = time.time()
+        begin_trace("image.generate-batch.stream", (request.options or {}).get("trace"))
+        completed = 0
+        failed = 0
+        total_cost = 0.0
+        total_size_mb = 0.0
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def generate_limited(panel_request: ImageRequest):
+            async with semaphore:
+                try:
+                    return panel_request.panel_number, await generate_panel_image(panel_request), None
+                except Exception as e:
+                    return panel_request.panel_number, None, e
+        
+        tasks = [
+            asyncio.create_task(generate_limited(panel_request))
+            for panel_request in get_batch_panels(request)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                panel_number, result, error = await next_done
+                if error is not None:
+                    failed += 1
+                    yield encode("error", {"panel_number": panel_number, "detail": str(error)})
+                    continue
+                
+                completed += 1
+                total_cost += result.get('generation_metadata', {}).get('cost', 0.04)
+                total_size_mb += result.get('size_mb', 0)
+                yield encode("image", {
+                    "result": result,
+                    "completed": completed,
+                    "total_panels": len(request.panels)
+                })
+        finally:
+            # 클라이언트가 끊기면 대기 중인 패널은 취소
+            for task in tasks:
+                task.cancel()
+        
+        yield encode("summary", {
+            "success": failed == 0,
+            "episode_id": request.episode_id,
+            "total_panels": len(request.panels),
+            "completed_panels": completed,
+            "failed_panels": failed,
+            "total_size_mb": round(total_size_mb, 2),
+            "metadata": {
+                "engine_version": "1.0.0",
+                "cost_units": total_cost,
+                "processing_time": round(time.time() - start_time, 2),
+                "model": "dall-e-3" if client else "dummy",
+                "max_concurrency": max_concurrency,
+                "warnings": [] if client else ["Using dummy images - OPENAI_API_KEY not configured"],
+                **trace_metadata()
+            }
+        })
+    
+    return StreamingResponse(event_stream(), media_type=media_type)
+
+def get_batch_panels(request: ImageEngineRequest) -> List[ImageRequest]:
+    """
+    배치 공통 options를 패널 요청에 반영 (options.bypass_cache)
+    """
+    options = request.options or {}
+    if options.get("bypass_cache"):
+        return [panel.model_copy(update={"bypass_cache": True}) for panel in request.panels]
+    return request.panels
+
+def get_batch_concurrency(options: Optional[Dict[str, Any]]) -> int:
+    """
+    요청 options에서 동시 생성 한도 추출 (1 ~ BATCH_MAX_CONCURRENCY)
+    """
+    options = options or {}
+    return max(1, min(int(options.get("max_concurrency", BATCH_MAX_CONCURRENCY)), BATCH_MAX_CONCURRENCY))
+
+async def generate_panel_image(request: ImageRequest) -> Dict[str, Any]:
+    """
+    패널 하나 생성 (API 키 없으면 더미 이미지)
+    """
+    if not client:
+        # MVP: 더미 이미지
+        return await run_in_threadpool(generate_dummy_image, request)
+    # Production: DALL-E 3 호출
+    return await generate_image_with_dalle3(request)
+
+async def generate_image_with_dalle3(request: ImageRequest) -> Dict[str, Any]:
     """
     DALL-E 3를 사용하여 이미지 생성
     """
@@ -204,19 +527,52 @@ def generate_image_with_dalle3(request: ImageRequest) -> Dict[str, Any]:
         # 프롬프트 강화
         enhanced_prompt = enhance_prompt(request.visual_prompt, request.style)
         
+        # 캐시 확인 (히트 시 OpenAI 호출 없이 저장된 이미지 사용)
+        cache_key = ImageCache.make_key("dall-e-3", size, "standard", enhanced_prompt, request.seed)
+        cached_path = None
+        if not request.bypass_cache:
+            cached_path = await run_in_threadpool(generation_cache.get, cache_key)
+        if cached_path:
+            try:
+                local_path = await run_in_threadpool(storage.store_file, cached_path, "png")
+            except FileNotFoundError:
+                # 조회 후 저장 전에 캐시 파일이 지워짐 → 더미로 폴백하지 않고 미스로 보고 새로 생성
+                await run_in_threadpool(generation_cache.invalidate, cache_key)
+                cached_path = None
+        if cached_path:
+            return {
+                "panel_number": request.panel_number,
+                "image_url": local_path,
+                "width": 1024,
+                "height": 1792,
+                "size_mb": get_file_size_mb(local_path),
+                "generation_metadata": {
+                    "model": "dall-e-3",
+                    "prompt": enhanced_prompt,
+                    "cost": 0.0,
+                    "size": size,
+                    "quality": "standard",
+                    "cache_hit": True,
+                    "cache_key": cache_key
+                }
+            }
+        
         # DALL-E 3 API 호출
-        response = client.images.generate(
-            model="dall-e-3",
-            prompt=enhanced_prompt,
-            size=size,
-            quality="standard",  # "hd" for higher quality
-            n=1
-        )
+        with track_provider("openai", "images.generate"):
+            response = await client.images.generate(
+                model="dall-e-3",
+                prompt=enhanced_prompt,
+                size=size,
+                quality="standard",  # "hd" for higher quality
+                n=1
+            )
         
         image_url = response.data[0].url
         
         # 이미지 다운로드 및 저장
-        local_path = save_image_from_url(image_url, request.panel_number)
+        with track_provider("openai", "images.download"):
+            local_path = await run_in_threadpool(save_image_from_url, image_url)
+        await run_in_threadpool(generation_cache.put, cache_key, local_path)
         
         return {
             "panel_number": request.panel_number,
@@ -230,67 +586,37 @@ def generate_image_with_dalle3(request: ImageRequest) -> Dict[str, Any]:
                 "original_url": image_url,
                 "cost": 0.04,
                 "size": size,
-                "quality": "standard"
+                "quality": "standard",
+                "cache_hit": False,
+                "cache_key": cache_key
             }
         }
-        
+    
     except Exception as e:
         print(f"DALL-E 3 API Error: {e}")
         # 에러 발생 시 더미 이미지로 폴백
-        return generate_dummy_image(request)
+        return await run_in_threadpool(generate_dummy_image, request)
 
 def generate_dummy_image(request: ImageRequest) -> Dict[str, Any]:
     """
-    더미 이미지 생성 (MVP용)
+    더미 이미지 생성 (MVP / 파이프라인 부하 테스트용)
+    
+    같은 (패널 번호, 크기, 압축 레벨)이면 항상 같은 PNG가 나오므로 인코딩 결과를 캐시해 두고,
+    내용 주소 저장소가 이미 있는 파일은 다시 쓰지 않는다.
     """
-    # 간단한 색상 이미지 생성
     width = min(request.width, 1024)
     height = min(request.height, 1792)
+    with span("render"):
+        png_bytes = render_dummy_png(request.panel_number, width, height, DUMMY_PNG_COMPRESS_LEVEL)
     
-    # PIL로 단색 이미지 생성
-    from PIL import Image, ImageDraw, ImageFont
-    
-    # 패널 번호에 따라 색상 변경
-    colors = [
-        (255, 200, 200),  # 연한 빨강
-        (200, 255, 200),  # 연한 초록
-        (200, 200, 255),  # 연한 파랑
-        (255, 255, 200),  # 연한 노랑
-        (255, 200, 255),  # 연한 보라
-    ]
-    color = colors[request.panel_number % len(colors)]
-    
-    img = Image.new('RGB', (width, height), color=color)
-    draw = ImageDraw.Draw(img)
-    
-    # 텍스트 추가
-    try:
-        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 40)
-    except:
-        font = ImageFont.load_default()
-    
-    text = f"Panel {request.panel_number}"
-    
-    # 텍스트 위치 계산 (중앙)
-    bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-    x = (width - text_width) // 2
-    y = (height - text_height) // 2
-    
-    draw.text((x, y), text, fill=(0, 0, 0), font=font)
-    
-    # 파일 저장
-    filename = f"panel_{request.panel_number:03d}_dummy.png"
-    filepath = os.path.join(STORAGE_DIR, filename)
-    img.save(filepath, 'PNG')
+    filepath = storage.store_bytes(png_bytes, "png")
     
     return {
         "panel_number": request.panel_number,
         "image_url": filepath,
         "width": width,
         "height": height,
-        "size_mb": get_file_size_mb(filepath),
+        "size_mb": round(len(png_bytes) / (1024 * 1024), 2),
         "generation_metadata": {
             "model": "dummy",
             "prompt": request.visual_prompt,
@@ -299,6 +625,43 @@ def generate_dummy_image(request: ImageRequest) -> Dict[str, Any]:
         }
     }
 
+@lru_cache(maxsize=1)
+def get_dummy_font():
+    """
+    더미 이미지용 폰트 (프로세스당 한 번만 로드)
+    """
+    try:
+        return ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 40)
+    except OSError:
+        return ImageFont.load_default()
+
+@lru_cache(maxsize=32)
+def get_dummy_canvas(color_index: int, width: int, height: int) -> Image.Image:
+    """
+    패널 번호별 5가지 배경색 캔버스 (복사해서 사용, 원본은 수정하지 않음)
+    """
+    return Image.new('RGB', (width, height), color=DUMMY_COLORS[color_index])
+
+@lru_cache(maxsize=DUMMY_PNG_CACHE_SIZE)
+def render_dummy_png(panel_number: int, width: int, height: int, compress_level: int) -> bytes:
+    """
+    더미 패널 PNG 인코딩 결과 (입력이 같으면 결과도 같으므로 캐시)
+    """
+    img = get_dummy_canvas(panel_number % len(DUMMY_COLORS), width, height).copy()
+    draw = ImageDraw.Draw(img)
+    font = get_dummy_font()
+    
+    # 텍스트 위치 계산 (중앙)
+    text = f"Panel {panel_number}"
+    bbox = draw.textbbox((0, 0), text, font=font)
+    x = (width - (bbox[2] - bbox[0])) // 2
+    y = (height - (bbox[3] - bbox[1])) // 2
+    draw.text((x, y), text, fill=(0, 0, 0), font=font)
+    
+    buffer = BytesIO()
+    img.save(buffer, 'PNG', compress_level=compress_level)
+    return buffer.getvalue()
+
 def enhance_prompt(prompt: str, style: str) -> str:
     """
     프롬프트 강화 (스타일 추가)
@@ -314,22 +677,60 @@ def enhance_prompt(prompt: str, style: str) -> str:
     
     return f"{prompt}, {modifier}"
 
-def save_image_from_url(url: str, panel_number: int) -> str:
+def save_image_from_url(url: str) -> str:
     """
-    URL에서 이미지 다운로드 및 저장
-    """
-    response = requests.get(url)
-    response.raise_for_status()
-    
-    img = Image.open(BytesIO(response.content))
+    URL에서 이미지 다운로드 후 내용 주소로 저장
     
-    timestamp = int(time.time())
-    filename = f"panel_{panel_number:03d}_{timestamp}.png"
-    filepath = os.path.join(STORAGE_DIR, filename)
-    
-    img.save(filepath, 'PNG')
+    PNG면 디코딩 없이 청크 단위로 바로 디스크에 기록하면서 해시를 함께 계산하고,
+    다른 포맷일 때만 PIL로 디코딩해 PNG로 변환
+    """
+    tmp_path = storage.staging_path("png")
     
-    return filepath
+    with download_session.get(
+        url,
+        stream=True,
+        timeout=(DOWNLOAD_CONNECT_TIMEOUT, DOWNLOAD_READ_TIMEOUT)
+    ) as response:
+        response.raise_for_status()
+        chunks = response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+        
+        # 첫 청크로 포맷 판별
+        head = b""
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= len(PNG_SIGNATURE):
+                break
+        
+        try:
+            if head.startswith(PNG_SIGNATURE):
+                digest = hashlib.sha256(head)
+                with open(tmp_path, "wb") as f:
+                    f.write(head)
+                    for chunk in chunks:
+                        f.write(chunk)
+                        digest.update(chunk)
+                return storage.store_file(tmp_path, "png", move=True, digest=digest.hexdigest())
+            
+            buffer = BytesIO(head)
+            for chunk in chunks:
+                buffer.write(chunk)
+            buffer.seek(0)
+            with Image.open(buffer) as img:
+                return storage.store_image(img, "png")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+def link_or_copy(src: str, dst: str):
+    """
+    하드링크로 복제 (다른 파일시스템이면 복사)
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
 
 def get_file_size_mb(filepath: str) -> float:
     """
@@ -340,6 +741,22 @@ def get_file_size_mb(filepath: str) -> float:
         return round(size_bytes / (1024 * 1024), 2)
     return 0.0
 
+# 비동기 작업 API (POST 즉시 job_id 반환, GET으로 상태/진행률/결과 조회)
+jobs = JobManager("image")
+jobs.register("generate", generate_single_image, ImageRequest)
+jobs.register("generate-batch", generate_batch_images, ImageEngineRequest)
+jobs.install(app, "/engine/image")
+
+# 저장된 패널/최종 이미지 직접 서빙 (Range, ETag, immutable 캐시)
+install_asset_routes(app, "/engine/image", STORAGE_DIR)
+
+# Prometheus 메트릭 (요청/외부 API 지연, 캐시, 작업 큐)
+metrics = install_metrics(app, "image", jobs)
+metrics.add_collector(lambda: cache_samples("generation", generation_cache.stats()))
+
+# 단계별 구간 추적 (X-Toonverse-Trace 헤더 또는 trace/options.trace 플래그)
+install_tracing(app)
+
 if __name__ == "__main__":
     print("=" * 60)
     print("🎨 TOONVERSE Image Engine Starting...")
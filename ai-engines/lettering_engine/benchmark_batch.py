@@ -0,0 +1,74 @@
+"""
+배치 레터링 벤치마크
+
+30패널 에피소드를 워커 수별로 레터링해 소요 시간과 속도 향상을 측정한다.
+
+    python benchmark_batch.py --panels 30 --workers 1,2,4,8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# main 임포트 전에 저장 경로를 임시 디렉토리로 돌린다
+# (spawn 워커는 이 모듈을 다시 임포트하지만 부모 값을 상속하므로 새 디렉토리를 만들지 않음)
+if "IMAGE_STORAGE_DIR" not in os.environ:
+    os.environ["IMAGE_STORAGE_DIR"] = tempfile.mkdtemp(prefix="toonverse_bench_")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image  # noqa: E402
+
+import main  # noqa: E402
+
+DIALOGUE = "네가 무엇을 하려는지 다 알고 있어. 그건 허락할 수 없지. 내가 해낼 수 있을까... 아니, 해내야만 해!"
+
+
+def make_panels(count: int, width: int, height: int):
+    panels = []
+    for i in range(count):
+        path = os.path.join(main.STORAGE_DIR, f"bench_source_{i + 1:03d}.png")
+        Image.effect_noise((width, height), 40).convert('RGB').save(path, 'PNG')
+        panels.append(main.LetteringRequest(
+            panel_number=i + 1,
+            image_path=path,
+            dialogue=DIALOGUE,
+            speaker="주인공",
+        ))
+    return panels
+
+
+def run(panels: int, worker_counts, width: int, height: int):
+    main.LETTERING_WORKERS = max(worker_counts)
+    request = main.LetteringBatchRequest(episode_id=1, panels=make_panels(panels, width, height))
+
+    # 프로세스 풀 기동 비용은 측정에서 제외
+    main.letter_panels_parallel(request.panels[:1], 1)
+
+    print(f"panels={panels} image={width}x{height} cpu_count={os.cpu_count()}")
+    print(f"{'workers':>8} {'wall_s':>8} {'speedup':>8}")
+    baseline = None
+    for workers in worker_counts:
+        request.options = {"workers": workers}
+        start = time.perf_counter()
+        response = main.apply_lettering_batch(request)
+        elapsed = time.perf_counter() - start
+
+        numbers = [r["panel_number"] for r in response.result["lettered_images"]]
+        assert numbers == list(range(1, panels + 1)), "results out of panel order"
+
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>8.2f} {baseline / elapsed:>7.1f}x")
+
+    main.shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lettering batch multi-core benchmark")
+    parser.add_argument("--panels", type=int, default=30)
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--height", type=int, default=1792)
+    args = parser.parse_args()
+
+    run(args.panels, [int(w) for w in args.workers.split(",")], args.width, args.height)
@@ -0,0 +1,62 @@
+"""
+패널 레터링 마이크로 벤치마크
+
+폰트 캐시 사용/미사용 상태에서 패널 1장당 레터링 시간을 비교한다.
+
+    python benchmark_lettering.py --panels 30 --width 1024 --height 1792
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# main 임포트 전에 저장 경로를 임시 디렉토리로 돌린다
+os.environ["IMAGE_STORAGE_DIR"] = tempfile.mkdtemp(prefix="toonverse_bench_")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image  # noqa: E402
+
+import main  # noqa: E402
+
+DIALOGUE = "이제 시작이야... 돌아갈 수 없어. 오늘이 모든 것을 바꿀 날이 될 것이다!"
+
+
+def make_panel(width: int, height: int) -> str:
+    path = os.path.join(main.STORAGE_DIR, "bench_panel.png")
+    Image.new('RGB', (width, height), (200, 200, 255)).save(path, 'PNG')
+    return path
+
+
+def time_panels(image_path: str, panels: int) -> float:
+    start = time.perf_counter()
+    for i in range(panels):
+        main.apply_text_overlay(image_path, DIALOGUE, "주인공", i + 1, "top-center", 32)
+    return (time.perf_counter() - start) / panels
+
+
+def run(panels: int, width: int, height: int):
+    image_path = make_panel(width, height)
+    cached_load_font = main.load_font
+
+    # 캐시 미사용: 매 호출마다 폰트 파일을 다시 읽는다
+    main.load_font = cached_load_font.__wrapped__
+    uncached = time_panels(image_path, panels)
+
+    main.load_font = cached_load_font
+    cached_load_font.cache_clear()
+    cached = time_panels(image_path, panels)
+
+    print(f"panels={panels} image={width}x{height} font={main.FONT_PATH or 'default'}")
+    print(f"  without cache: {uncached * 1000:8.2f} ms/panel")
+    print(f"  with cache:    {cached * 1000:8.2f} ms/panel ({cached_load_font.cache_info()})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lettering font cache micro-benchmark")
+    parser.add_argument("--panels", type=int, default=30)
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--height", type=int, default=1792)
+    args = parser.parse_args()
+
+    run(args.panels, args.width, args.height)
@@ -0,0 +1,89 @@
+"""
+줄바꿈 벤치마크
+
+긴 한국어 대사에 대해 기존 방식(줄이 늘어날 때마다 draw.textbbox로 다시 측정)과
+토큰 폭 캐시 방식(wrap_text)의 소요 시간을 비교한다.
+
+    python benchmark_wrap.py --sentences 200 --max-width 924
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# main 임포트 전에 저장 경로를 임시 디렉토리로 돌린다
+os.environ["IMAGE_STORAGE_DIR"] = tempfile.mkdtemp(prefix="toonverse_bench_")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+import main  # noqa: E402
+
+SENTENCES = [
+    "이제 시작이야... 돌아갈 수 없어.",
+    "넌 누구야? 왜 날 방해하는 거지?",
+    "네가 무엇을 하려는지 다 알고 있어. 그건 허락할 수 없지.",
+    "내가 해낼 수 있을까... 아니, 해내야만 해!",
+    "이겼어... 하지만 이게 끝이 아니야.",
+    "넌 해냈어. 이제 준비해야 해. 진짜는 이제부터야.",
+    "네가 진실을 알게 될 날이 곧 온다...",
+]
+
+
+def legacy_wrap_text(text, font, max_width, draw):
+    """기존 구현 (비교 기준)"""
+    lines = []
+    current_line = ""
+    for word in text.split():
+        test_line = current_line + word + " "
+        bbox = draw.textbbox((0, 0), test_line, font=font)
+        if bbox[2] - bbox[0] <= max_width:
+            current_line = test_line
+        else:
+            if current_line:
+                lines.append(current_line.strip())
+            current_line = word + " "
+    if current_line:
+        lines.append(current_line.strip())
+    return "\n".join(lines)
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sentences: int, max_width: int, font_size: int, repeat: int):
+    font = main.load_font(main.FONT_PATH, font_size)
+    draw = ImageDraw.Draw(Image.new('RGB', (max_width + 100, 100)))
+    script = " ".join(SENTENCES[i % len(SENTENCES)] for i in range(sentences))
+    no_spaces = script.replace(" ", "")
+
+    print(f"chars={len(script)} max_width={max_width} font={main.FONT_PATH or 'default'} size={font_size}")
+
+    legacy = best_of(lambda: legacy_wrap_text(script, font, max_width, draw), repeat)
+    main.text_width.cache_clear()
+    cold = best_of(lambda: (main.text_width.cache_clear(), main.wrap_text(script, font, max_width)), repeat)
+    warm = best_of(lambda: main.wrap_text(script, font, max_width), repeat)
+    char_mode = best_of(lambda: main.wrap_text(no_spaces, font, max_width, line_break="char"), repeat)
+
+    print(f"  legacy textbbox wrap:       {legacy * 1000:9.2f} ms")
+    print(f"  wrap_text (cold cache):     {cold * 1000:9.2f} ms ({legacy / cold:.1f}x)")
+    print(f"  wrap_text (warm cache):     {warm * 1000:9.2f} ms ({legacy / warm:.1f}x)")
+    print(f"  wrap_text (char, no spaces): {char_mode * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lettering word-wrap benchmark")
+    parser.add_argument("--sentences", type=int, default=200)
+    parser.add_argument("--max-width", type=int, default=924)
+    parser.add_argument("--font-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run(args.sentences, args.max_width, args.font_size, args.repeat)
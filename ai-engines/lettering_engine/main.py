@@ -3,10 +3,27 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 import os
+import sys
+import re
 import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from bisect import bisect_right
 from datetime import datetime
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 import textwrap
+from pathlib import Path
+
+# 공통 모듈 (ai-engines 디렉토리 기준 임포트)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.assets import asset_endpoint, install_asset_routes  # noqa: E402
+from common.jobs import JobManager, report_progress  # noqa: E402
+from common.metrics import IMAGE_BYTES_WRITTEN, install_metrics, lru_cache_samples  # noqa: E402
+from common.storage import AssetStorage  # noqa: E402
+from common.tracing import begin_trace, current_trace, install_tracing, run_traced, span, trace_metadata  # noqa: E402
 
 app = FastAPI(
     title="TOONVERSE Lettering Engine",
@@ -27,6 +44,57 @@ app.add_middleware(
 STORAGE_DIR = os.getenv("IMAGE_STORAGE_DIR", "/var/www/toonverse/webapp/storage/images")
 os.makedirs(STORAGE_DIR, exist_ok=True)
 
+# 레터링 결과는 내용 주소로 저장 (같은 패널 번호의 다른 에피소드끼리 덮어쓰지 않음)
+storage = AssetStorage(STORAGE_DIR)
+
+# 폰트 후보 (한글 지원 폰트 우선)
+FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf",  # Ubuntu/Debian 한글 폰트
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+]
+FONT_CACHE_SIZE = int(os.getenv("LETTERING_FONT_CACHE_SIZE", "64"))
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def load_font(path: Optional[str], size: int) -> ImageFont.ImageFont:
+    """
+    (경로, 크기)별 폰트 객체 캐시
+    """
+    if path is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(path, size)
+
+def resolve_font_path() -> Optional[str]:
+    """
+    사용할 폰트 결정 (시작 시 한 번만 폴백 체인 확인)
+    """
+    for path in FONT_CANDIDATES:
+        try:
+            load_font(path, 32)
+            return path
+        except OSError:
+            continue
+    return None
+
+FONT_PATH = resolve_font_path()
+
+# 배치 레터링 프로세스 풀 크기 (options.workers로 요청별 동시 처리 수 조정 가능)
+LETTERING_WORKERS = int(os.getenv("LETTERING_WORKERS", str(os.cpu_count() or 1)))
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    배치 레터링용 공유 프로세스 풀 (첫 사용 시 생성)
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=LETTERING_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _process_pool
+
 class LetteringRequest(BaseModel):
     panel_number: int
     image_path: str
@@ -34,16 +102,24 @@ class LetteringRequest(BaseModel):
     speaker: str = ""
     bubble_position: str = "top-center"  # top-left, top-center, top-right, center, bottom-left, bottom-center, bottom-right
     font_size: int = 32
+    line_break: str = "auto"  # auto (단어 단위, 필요 시 글자 단위), word, char
+    trace: bool = False  # apply: 단계별 소요 시간을 metadata.timings로 반환 (배치는 options.trace)
 
 class LetteringBatchRequest(BaseModel):
     episode_id: int
     panels: List[LetteringRequest]
+    options: Optional[Dict[str, Any]] = {}
 
 class LetteringResponse(BaseModel):
     success: bool
     result: Dict[str, Any]
     metadata: Dict[str, Any]
 
+@app.on_event("shutdown")
+def shutdown_process_pool():
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+
 @app.get("/")
 def root():
     """Health check endpoint"""
@@ -64,12 +140,18 @@ def health_check():
         "service": "lettering_engine",
         "storage_dir": STORAGE_DIR,
         "storage_writable": storage_writable,
+        "font_path": FONT_PATH or "default",
+        "font_cache": load_font.cache_info()._asdict(),
+        "jobs": jobs.stats(),
         "timestamp": datetime.now().isoformat(),
         "endpoints": [
             "/",
             "/health",
             "/engine/lettering/apply",
-            "/engine/lettering/apply-batch"
+            "/engine/lettering/apply-batch",
+            *jobs.endpoints("/engine/lettering"),
+            asset_endpoint("/engine/lettering"),
+            "/metrics"
         ]
     }
 
@@ -79,16 +161,10 @@ def apply_lettering(request: LetteringRequest):
     단일 패널에 대사 합성
     """
     start_time = time.time()
+    begin_trace("lettering.apply", request.trace)
     
     try:
-        result = apply_text_overlay(
-            request.image_path,
-            request.dialogue,
-            request.speaker,
-            request.panel_number,
-            request.bubble_position,
-            request.font_size
-        )
+        result = letter_panel(request)
         
         processing_time = time.time() - start_time
         
@@ -99,7 +175,8 @@ def apply_lettering(request: LetteringRequest):
                 "engine_version": "1.0.0",
                 "cost_units": 0.0,
                 "processing_time": round(processing_time, 2),
-                "model": "pil"
+                "model": "pil",
+                **trace_metadata()
             }
         )
         
@@ -114,18 +191,17 @@ def apply_lettering_batch(request: LetteringBatchRequest):
     start_time = time.time()
     
     try:
-        results = []
+        options = request.options or {}
+        workers = max(1, min(int(options.get("workers", LETTERING_WORKERS)), LETTERING_WORKERS))
+        begin_trace("lettering.apply-batch", options.get("trace"))
         
-        for panel_request in request.panels:
-            result = apply_text_overlay(
-                panel_request.image_path,
-                panel_request.dialogue,
-                panel_request.speaker,
-                panel_request.panel_number,
-                panel_request.bubble_position,
-                panel_request.font_size
-            )
-            results.append(result)
+        if workers > 1 and len(request.panels) > 1:
+            results = letter_panels_parallel(request.panels, workers)
+        else:
+            results = []
+            for panel_request in request.panels:
+                results.append(letter_panel(panel_request))
+                report_progress(len(results), len(request.panels))
         
         processing_time = time.time() - start_time
         
@@ -140,20 +216,84 @@ def apply_lettering_batch(request: LetteringBatchRequest):
                 "engine_version": "1.0.0",
                 "cost_units": 0.0,
                 "processing_time": round(processing_time, 2),
-                "model": "pil"
+                "model": "pil",
+                "workers": workers,
+                **trace_metadata()
             }
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def letter_panel(request: LetteringRequest) -> Dict[str, Any]:
+    """
+    패널 하나 레터링 (프로세스 풀 작업 단위)
+    """
+    return apply_text_overlay(
+        request.image_path,
+        request.dialogue,
+        request.speaker,
+        request.panel_number,
+        request.bubble_position,
+        request.font_size,
+        request.line_break
+    )
+
+def letter_panel_worker(request: LetteringRequest) -> tuple:
+    """
+    프로세스 풀 작업 단위: (결과, 이 패널에서 실제로 기록한 바이트 수)
+    
+    워커 프로세스의 메트릭은 수집되지 않으므로 부모가 기록량을 대신 집계한다.
+    내용 주소 저장소에 같은 파일이 이미 있으면 0 (워커는 한 번에 작업 하나만 실행하므로 누적 기록량 차이로 계산)
+    """
+    before = storage.bytes_written
+    result = letter_panel(request)
+    return result, storage.bytes_written - before
+
+def letter_panels_parallel(panels: List[LetteringRequest], workers: int) -> List[Dict[str, Any]]:
+    """
+    프로세스 풀에서 패널을 병렬 레터링 (동시에 최대 workers개, 결과는 패널 순서대로)
+    """
+    pool = get_process_pool()
+    # 추적 중이면 워커 프로세스에서도 구간을 모아 결과와 함께 돌려받음
+    trace = current_trace.get()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(panels)
+    pending = {}
+    next_index = 0
+    completed = 0
+    
+    while next_index < len(panels) or pending:
+        while next_index < len(panels) and len(pending) < workers:
+            if trace is None:
+                future = pool.submit(letter_panel_worker, panels[next_index])
+            else:
+                future = pool.submit(run_traced, letter_panel_worker, panels[next_index])
+            pending[future] = next_index
+            next_index += 1
+        
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            output = future.result()
+            if trace is not None:
+                output, spans = output
+                trace.extend(spans)
+            results[pending.pop(future)], bytes_written = output
+            completed += 1
+            # 워커 프로세스의 메트릭은 수집되지 않으므로 기록량은 여기서 집계 (중복 저장분 제외)
+            if bytes_written:
+                IMAGE_BYTES_WRITTEN.inc(bytes_written, format="png")
+        report_progress(completed, len(panels))
+    
+    return results
+
 def apply_text_overlay(
     image_path: str,
     dialogue: str,
     speaker: str,
     panel_number: int,
     bubble_position: str = "top-center",
-    font_size: int = 32
+    font_size: int = 32,
+    line_break: str = "auto"
 ) -> Dict[str, Any]:
     """
     이미지에 텍스트 오버레이 적용
@@ -161,28 +301,14 @@ def apply_text_overlay(
     if not os.path.exists(image_path):
         raise FileNotFoundError(f"Image not found: {image_path}")
     
-    # 이미지 로드
-    img = Image.open(image_path)
-    draw = ImageDraw.Draw(img)
-    
-    # 폰트 로드 (한글 지원)
-    try:
-        # Ubuntu/Debian 한글 폰트
-        font = ImageFont.truetype("/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf", font_size)
-    except:
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
-    
-    # 대사가 있으면 텍스트 추가
-    if dialogue:
-        add_text_with_bubble(img, draw, dialogue, speaker, bubble_position, font)
+    # 이미지 로드 (Image.open은 헤더만 읽으므로 디코딩까지 여기서)
+    with span("decode"):
+        img = Image.open(image_path)
+        img.load()
+    letter_image(img, dialogue, speaker, bubble_position, font_size, line_break)
     
     # 저장
-    filename = f"panel_{panel_number:03d}_lettered.png"
-    output_path = os.path.join(STORAGE_DIR, filename)
-    img.save(output_path, 'PNG')
+    output_path = storage.store_image(img, "png")
     
     return {
         "panel_number": panel_number,
@@ -191,25 +317,45 @@ def apply_text_overlay(
         "speaker": speaker
     }
 
+def letter_image(
+    img: Image.Image,
+    dialogue: str,
+    speaker: str,
+    bubble_position: str = "top-center",
+    font_size: int = 32,
+    line_break: str = "auto"
+) -> Image.Image:
+    """
+    메모리상의 이미지에 대사 합성 (파일 입출력 없음, img를 직접 수정)
+    """
+    if dialogue:
+        draw = ImageDraw.Draw(img)
+        
+        # 폰트 로드 (한글 지원, 캐시 사용)
+        font = load_font(FONT_PATH, font_size)
+        add_text_with_bubble(img, draw, dialogue, speaker, bubble_position, font, line_break)
+    
+    return img
+
 def add_text_with_bubble(
     img: Image.Image,
     draw: ImageDraw.Draw,
     text: str,
     speaker: str,
     position: str,
-    font: ImageFont.ImageFont
+    font: ImageFont.ImageFont,
+    line_break: str = "auto"
 ):
     """
     말풍선과 텍스트 추가
     """
     width, height = img.size
     
-    # 텍스트 줄바꿈 (최대 너비)
-    max_width = width - 100
-    wrapped_text = wrap_text(text, font, max_width, draw)
-    
-    # 텍스트 크기 계산
-    bbox = draw.multiline_textbbox((0, 0), wrapped_text, font=font)
+    # 텍스트 줄바꿈 (최대 너비) + 크기 계산
+    with span("layout"):
+        max_width = width - 100
+        wrapped_text = wrap_text(text, font, max_width, draw, line_break)
+        bbox = draw.multiline_textbbox((0, 0), wrapped_text, font=font)
     text_width = bbox[2] - bbox[0]
     text_height = bbox[3] - bbox[1]
     
@@ -221,53 +367,128 @@ def add_text_with_bubble(
     # 위치 계산
     x, y = calculate_position(width, height, bubble_width, bubble_height, position)
     
-    # 말풍선 그리기 (흰색 배경, 검은색 테두리)
-    bubble_coords = [x, y, x + bubble_width, y + bubble_height]
-    draw.rectangle(bubble_coords, fill=(255, 255, 255), outline=(0, 0, 0), width=3)
-    
-    # 텍스트 그리기
-    text_x = x + padding
-    text_y = y + padding
-    draw.multiline_text((text_x, text_y), wrapped_text, fill=(0, 0, 0), font=font)
+    with span("draw"):
+        # 말풍선 그리기 (흰색 배경, 검은색 테두리)
+        bubble_coords = [x, y, x + bubble_width, y + bubble_height]
+        draw.rectangle(bubble_coords, fill=(255, 255, 255), outline=(0, 0, 0), width=3)
+        
+        # 텍스트 그리기
+        text_x = x + padding
+        text_y = y + padding
+        draw.multiline_text((text_x, text_y), wrapped_text, fill=(0, 0, 0), font=font)
     
     # 화자 이름 (선택적)
     if speaker:
-        try:
-            small_font = ImageFont.truetype(font.path, font.size // 2)
-        except:
+        if isinstance(getattr(font, "path", None), str):
+            small_font = load_font(font.path, font.size // 2)
+        else:
             small_font = font
         
         speaker_text = f"[{speaker}]"
-        speaker_bbox = draw.textbbox((0, 0), speaker_text, font=small_font)
+        with span("layout"):
+            speaker_bbox = draw.textbbox((0, 0), speaker_text, font=small_font)
         speaker_width = speaker_bbox[2] - speaker_bbox[0]
         
         # 말풍선 위에 화자 이름
         speaker_x = x + (bubble_width - speaker_width) // 2
         speaker_y = y - 25
-        draw.text((speaker_x, speaker_y), speaker_text, fill=(0, 0, 0), font=small_font)
+        with span("draw"):
+            draw.text((speaker_x, speaker_y), speaker_text, fill=(0, 0, 0), font=small_font)
+
+# 공백 없이 이어 쓰는 문자 (한자, 가나, 전각 문장부호) - auto 모드에서 글자 단위로 줄바꿈 허용
+CJK_CHAR_PATTERN = re.compile(
+    "[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]"
+)
+NO_LINE_START = set("、。，．！？：；」』）〉》】〕ー々ぁぃぅぇぉっゃゅょァィゥェォッャュョ")
+
+@lru_cache(maxsize=16384)
+def text_width(font: ImageFont.ImageFont, text: str) -> float:
+    """
+    (폰트, 토큰)별 advance 폭 캐시
+    """
+    return font.getlength(text)
+
+def split_tokens(word: str, line_break: str) -> List[str]:
+    """
+    단어를 줄바꿈 가능한 토큰으로 분리
+    """
+    if line_break == "char":
+        return list(word)
+    if line_break == "auto" and CJK_CHAR_PATTERN.search(word):
+        # 한자/가나는 글자마다 끊을 수 있고, 한글/라틴 문자열은 묶어서 유지
+        tokens = []
+        for token in re.split(f"({CJK_CHAR_PATTERN.pattern})", word):
+            if not token:
+                continue
+            if tokens and token in NO_LINE_START:
+                # 닫는 문장부호는 줄 맨 앞에 오지 않도록 앞 글자에 붙임
+                tokens[-1] += token
+            else:
+                tokens.append(token)
+        return tokens
+    return [word]
 
-def wrap_text(text: str, font: ImageFont.ImageFont, max_width: int, draw: ImageDraw.Draw) -> str:
+def break_long_token(token: str, font: ImageFont.ImageFont, max_width: int) -> List[str]:
+    """
+    한 줄보다 긴 토큰을 글자 단위로 분할 (누적 폭에서 이분 탐색)
+    """
+    pieces = []
+    while token:
+        cumulative = []
+        total = 0.0
+        for char in token:
+            total += text_width(font, char)
+            cumulative.append(total)
+        cut = max(1, bisect_right(cumulative, max_width))
+        pieces.append(token[:cut])
+        token = token[cut:]
+    return pieces
+
+def wrap_text(
+    text: str,
+    font: ImageFont.ImageFont,
+    max_width: int,
+    draw: Optional[ImageDraw.ImageDraw] = None,
+    line_break: str = "auto"
+) -> str:
     """
     텍스트 자동 줄바꿈
+    
+    토큰별 폭을 캐시해 줄 폭을 누적 합으로 계산 (줄마다 다시 측정하지 않음).
+    line_break: auto (단어 단위, 한자/가나와 한 줄보다 긴 단어는 글자 단위),
+                word (단어 단위), char (모든 글자 단위)
     """
+    space_width = text_width(font, " ")
     lines = []
-    words = text.split()
-    current_line = ""
     
-    for word in words:
-        test_line = current_line + word + " "
-        bbox = draw.textbbox((0, 0), test_line, font=font)
-        test_width = bbox[2] - bbox[0]
+    for paragraph in text.split("\n"):
+        current_line = ""
+        current_width = 0.0
         
-        if test_width <= max_width:
-            current_line = test_line
-        else:
-            if current_line:
-                lines.append(current_line.strip())
-            current_line = word + " "
-    
-    if current_line:
-        lines.append(current_line.strip())
+        for word in paragraph.split():
+            for index, token in enumerate(split_tokens(word, line_break)):
+                # 단어의 첫 토큰 앞에는 공백, char 모드도 원래 공백만 유지
+                separator = " " if index == 0 and current_line else ""
+                token_width = text_width(font, token)
+                added_width = token_width + (space_width if separator else 0.0)
+                
+                if current_width + added_width <= max_width:
+                    current_line += separator + token
+                    current_width += added_width
+                    continue
+                
+                if current_line:
+                    lines.append(current_line)
+                
+                if token_width <= max_width:
+                    current_line, current_width = token, token_width
+                else:
+                    *full_pieces, current_line = break_long_token(token, font, max_width)
+                    lines.extend(full_pieces)
+                    current_width = text_width(font, current_line)
+        
+        if current_line:
+            lines.append(current_line)
     
     return "\n".join(lines)
 
@@ -289,6 +510,23 @@ def calculate_position(img_width: int, img_height: int, bubble_width: int, bubbl
     
     return positions.get(position, positions["top-center"])
 
+# 비동기 작업 API (POST 즉시 job_id 반환, GET으로 상태/진행률/결과 조회)
+jobs = JobManager("lettering")
+jobs.register("apply", apply_lettering, LetteringRequest)
+jobs.register("apply-batch", apply_lettering_batch, LetteringBatchRequest)
+jobs.install(app, "/engine/lettering")
+
+# 저장된 패널/최종 이미지 직접 서빙 (Range, ETag, immutable 캐시)
+install_asset_routes(app, "/engine/lettering", STORAGE_DIR)
+
+# Prometheus 메트릭 (요청/외부 API 지연, 캐시, 작업 큐)
+metrics = install_metrics(app, "lettering", jobs)
+metrics.add_collector(lambda: lru_cache_samples("font", load_font.cache_info()))
+metrics.add_collector(lambda: lru_cache_samples("text_width", text_width.cache_info()))
+
+# 단계별 구간 추적 (X-Toonverse-Trace 헤더 또는 trace/options.trace 플래그)
+install_tracing(app)
+
 if __name__ == "__main__":
     print("=" * 60)
     print("📝 TOONVERSE Lettering Engine Starting...")
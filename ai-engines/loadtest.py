@@ -0,0 +1,232 @@
+"""
+엔진 부하 테스트
+
+로컬 목(mock) OpenAI 프로바이더를 띄우고, 엔진을 uvicorn 서브프로세스로 실행해
+동시 요청을 보낸 뒤 초당 처리량(RPS)과 지연 시간을 측정한다.
+
+    python loadtest.py image --requests 200 --concurrency 64 --provider-latency 0.5
+    python loadtest.py director --requests 200 --concurrency 64
+
+변경 전/후 비교는 --engine-dir로 다른 체크아웃의 엔진 디렉토리를 지정한다.
+
+    git worktree add /tmp/toonverse-before <commit>
+    python loadtest.py image --engine-dir /tmp/toonverse-before/ai-engines/image_engine
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+ENGINES = {
+    "director": {
+        "dir": "director_engine",
+        "path": "/engine/director/storyboard",
+    },
+    "image": {
+        "dir": "image_engine",
+        "path": "/engine/image/generate",
+    },
+}
+
+MOCK_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010802000000907753"
+    "de0000000c4944415408d763f8ffff3f0005fe02fea7d6a4c00000000049454e44ae426082"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def create_mock_provider(latency: float) -> Starlette:
+    """OpenAI chat/images API와 생성 이미지 URL을 흉내내는 목 프로바이더"""
+
+    async def chat_completions(request: Request):
+        await request.body()
+        await asyncio.sleep(latency)
+        panels = [
+            {
+                "panel_number": 1,
+                "scene": "오프닝",
+                "location": "거리",
+                "characters": ["주인공"],
+                "action": "걷는다",
+                "dialogue": "",
+                "camera_angle": "wide shot",
+                "mood": "serious",
+                "visual_prompt": "a street",
+            }
+        ]
+        return JSONResponse({
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "mock",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": json.dumps({"panels": panels})},
+                }
+            ],
+        })
+
+    async def image_generations(request: Request):
+        await request.body()
+        await asyncio.sleep(latency)
+        return JSONResponse({
+            "created": int(time.time()),
+            "data": [{"url": f"http://{request.headers['host']}/image.png"}],
+        })
+
+    async def image_file(request: Request):
+        return Response(MOCK_PNG, media_type="image/png")
+
+    return Starlette(routes=[
+        Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+        Route("/v1/images/generations", image_generations, methods=["POST"]),
+        Route("/image.png", image_file),
+    ])
+
+
+def start_mock_provider(latency: float) -> uvicorn.Server:
+    config = uvicorn.Config(
+        create_mock_provider(latency),
+        host="127.0.0.1",
+        port=free_port(),
+        log_level="warning",
+        backlog=4096,
+    )
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def start_engine(engine_dir: Path, port: int, provider_url: str, storage_dir: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY="sk-mock",
+        OPENAI_BASE_URL=provider_url,
+        IMAGE_STORAGE_DIR=storage_dir,
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=engine_dir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("engine did not become healthy within 30s")
+
+
+def build_payload(engine: str, index: int) -> dict:
+    if engine == "image":
+        return {
+            "panel_number": index % 999 + 1,
+            "visual_prompt": f"load test panel {index}",
+            "bypass_cache": True,
+        }
+    return {
+        "project": {"title": "Load Test", "genre": "action", "tone": "serious"},
+        "episode": {"script_text": f"## 씬 1 - 테스트 {index}\n주인공이 달린다."},
+        "inputs": {"target_panels": 1},
+        "options": {},
+    }
+
+
+async def run_load(url: str, engine: str, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=300) as http:
+        async def one(index: int):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await http.post(url, json=build_payload(engine, index))
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 2),
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine load test against a local mock provider")
+    parser.add_argument("engine", choices=sorted(ENGINES))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--provider-latency", type=float, default=0.5, help="mock provider latency (s)")
+    parser.add_argument("--engine-dir", help="engine directory to test (default: this checkout)")
+    args = parser.parse_args()
+
+    spec = ENGINES[args.engine]
+    engine_dir = Path(args.engine_dir or Path(__file__).resolve().parent / spec["dir"])
+
+    provider = start_mock_provider(args.provider_latency)
+    provider_url = f"http://127.0.0.1:{provider.config.port}/v1"
+    port = free_port()
+
+    with tempfile.TemporaryDirectory(prefix="toonverse_load_") as storage_dir:
+        process = start_engine(engine_dir, port, provider_url, storage_dir)
+        try:
+            stats = asyncio.run(
+                run_load(f"http://127.0.0.1:{port}{spec['path']}", args.engine, args.requests, args.concurrency)
+            )
+        finally:
+            process.terminate()
+            process.wait()
+            provider.should_exit = True
+
+    print(f"engine={args.engine} dir={engine_dir} provider_latency={args.provider_latency}s "
+          f"concurrency={args.concurrency}")
+    for key, value in stats.items():
+        print(f"  {key:>10}: {value}")
+
+
+if __name__ == "__main__":
+    main()
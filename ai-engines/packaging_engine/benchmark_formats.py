@@ -0,0 +1,82 @@
+"""
+출력 포맷/품질 프리셋 벤치마크
+
+저장소의 샘플 패널(storage/images)을 세로로 합친 스트립을 포맷(PNG, WebP,
+progressive JPEG, AVIF)과 프리셋(low, balanced, high)별로 인코딩해
+인코딩 시간과 파일 크기를 비교한다. 패널 단위 결과도 함께 출력한다.
+
+    python benchmark_formats.py --panels 10 --formats png,webp,jpeg,avif
+    python benchmark_formats.py --images-dir /path/to/panels
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# main 임포트 전에 저장 경로를 임시 디렉토리로 돌린다
+os.environ["IMAGE_STORAGE_DIR"] = tempfile.mkdtemp(prefix="toonverse_bench_")
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from PIL import Image  # noqa: E402
+
+import main  # noqa: E402
+
+DEFAULT_IMAGES_DIR = Path(__file__).resolve().parent.parent.parent / "storage" / "images"
+
+
+def find_panels(images_dir: str, count: int):
+    paths = sorted(glob.glob(os.path.join(images_dir, "panel_*.png")))
+    if not paths:
+        raise SystemExit(f"no panel_*.png found in {images_dir}")
+    return paths[:count]
+
+
+def encode_all(label: str, image: Image.Image, formats, presets, output_dir: str):
+    baseline = None
+    for fmt in formats:
+        for preset in presets:
+            path = os.path.join(output_dir, f"{label}_{preset}.{main.FORMAT_EXTENSIONS[fmt]}")
+            try:
+                output = main.encode_image(image, fmt, preset, path)
+            except Exception as e:
+                print(f"{label:>8} {fmt:>6} {preset:>9}   skipped: {e}")
+                continue
+            baseline = baseline or output["file_size"]
+            print(f"{label:>8} {fmt:>6} {preset:>9} {output['encode_time']:>9.3f} "
+                  f"{output['file_size'] / 1024:>10.1f} {output['file_size'] / baseline:>7.2f}")
+
+
+def run(images_dir: str, panels: int, formats, presets, spacing: int):
+    paths = find_panels(images_dir, panels)
+    output_dir = main.FINAL_DIR
+    formats = main.resolve_output_formats(formats, "balanced")[0] if formats else []
+
+    print(f"images_dir={images_dir} panels={len(paths)}")
+    print(f"{'input':>8} {'format':>6} {'preset':>9} {'encode_s':>9} {'size_kb':>10} {'ratio':>7}")
+
+    with Image.open(paths[0]) as panel:
+        panel.load()
+        encode_all("panel", panel.convert('RGB'), formats, presets, output_dir)
+
+    strip = main.merge_panels([Image.open(path) for path in paths], "vertical", spacing)
+    print(f"strip size={strip.width}x{strip.height}")
+    encode_all("strip", strip, formats, presets, output_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Packaging output format benchmark")
+    parser.add_argument("--images-dir", default=str(DEFAULT_IMAGES_DIR))
+    parser.add_argument("--panels", type=int, default=10)
+    parser.add_argument("--formats", default="png,webp,jpeg,avif")
+    parser.add_argument("--presets", default="low,balanced,high")
+    parser.add_argument("--spacing", type=int, default=10)
+    args = parser.parse_args()
+
+    available = [fmt for fmt in args.formats.split(",") if main.is_format_available(main.FORMAT_ALIASES.get(fmt, fmt))]
+    skipped = sorted(set(args.formats.split(",")) - set(available))
+    if skipped:
+        print(f"skipping formats not supported by this Pillow build: {', '.join(skipped)}")
+
+    run(args.images_dir, args.panels, available, args.presets.split(","), args.spacing)
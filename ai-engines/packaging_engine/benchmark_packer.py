@@ -0,0 +1,114 @@
+"""
+2단계 패커 벤치마크
+
+패널을 전부 Image.open으로 열어둔 채 병합하는 기존 방식(open-all)과
+헤더만 읽어 레이아웃을 잡은 뒤 한 장씩 디코딩/붙여넣기하는 compose_panels(two-phase)의
+소요 시간, 최대 RSS, 최대 열린 파일 수를 비교한다. 최대 RSS는 프로세스 단위라
+방식마다 별도 서브프로세스에서 측정한다.
+
+    python benchmark_packer.py --panels 40 --layout vertical
+    python benchmark_packer.py --panels 40 --layout grid --columns 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# main 임포트 전에 저장 경로를 임시 디렉토리로 돌린다
+os.environ.setdefault("IMAGE_STORAGE_DIR", tempfile.mkdtemp(prefix="toonverse_bench_"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from PIL import Image  # noqa: E402
+
+import main  # noqa: E402
+
+MODES = ["open-all", "two-phase"]
+
+
+def make_panels(count: int, width: int, height: int):
+    paths = []
+    for i in range(count):
+        path = os.path.join(main.STORAGE_DIR, f"bench_panel_{i + 1:03d}.png")
+        # 두 장에 한 장은 1.5배 크기로 만들어 리사이즈 경로도 포함
+        scale = 1.5 if i % 2 else 1.0
+        size = (int(width * scale), int(height * scale))
+        Image.effect_noise(size, 40).convert('RGB').save(path, 'PNG', compress_level=1)
+        paths.append(path)
+    return paths
+
+
+class FdSampler(threading.Thread):
+    """열린 파일 디스크립터 수의 최댓값 기록"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = 0
+        self.running = True
+
+    def run(self):
+        while self.running:
+            self.peak = max(self.peak, len(os.listdir("/proc/self/fd")))
+            time.sleep(0.002)
+
+
+def run_mode(mode: str, paths, layout: str, columns: int, spacing: int) -> dict:
+    sampler = FdSampler()
+    sampler.start()
+    start = time.perf_counter()
+
+    if mode == "open-all":
+        images = [Image.open(path) for path in paths]
+        final_image = main.merge_panels(images, layout, spacing, columns=columns)
+    else:
+        final_image = main.compose_panels(paths, layout, spacing, columns=columns)
+
+    elapsed = time.perf_counter() - start
+    sampler.running = False
+    sampler.join()
+
+    return {
+        "mode": mode,
+        "size": f"{final_image.width}x{final_image.height}",
+        "wall_s": round(elapsed, 2),
+        "peak_rss_mb": main.get_peak_rss_mb(),
+        "peak_open_fds": sampler.peak,
+    }
+
+
+def run(args):
+    paths = make_panels(args.panels, args.width, args.height)
+    print(f"panels={args.panels} layout={args.layout} columns={args.columns} panel={args.width}x{args.height}")
+    print(f"{'mode':>10} {'size':>12} {'wall_s':>8} {'peak_rss_mb':>12} {'peak_open_fds':>14}")
+
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--layout", args.layout,
+             "--columns", str(args.columns), "--spacing", str(args.spacing), *paths],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        stats = json.loads(output.strip().splitlines()[-1])
+        print(f"{stats['mode']:>10} {stats['size']:>12} {stats['wall_s']:>8.2f} "
+              f"{stats['peak_rss_mb']:>12.1f} {stats['peak_open_fds']:>14}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Packaging two-phase packer benchmark")
+    parser.add_argument("--panels", type=int, default=40)
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--height", type=int, default=1792)
+    parser.add_argument("--layout", default="vertical", choices=["vertical", "grid"])
+    parser.add_argument("--columns", type=int, default=2)
+    parser.add_argument("--spacing", type=int, default=10)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("paths", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child, args.paths, args.layout, args.columns, args.spacing)))
+    else:
+        run(args)
@@ -0,0 +1,105 @@
+"""
+패널 크기 맞춤(resize) 벤치마크
+
+크기가 섞인 패널 세트(기준 폭, 2배/4배 폭, 비정수 배율, 작은 패널, JPEG 원본)를
+세로로 병합하면서 기존 방식(항상 원본 해상도에서 LANCZOS)과 resize_image의
+quality/fast 모드의 소요 시간과 기존 결과 대비 평균 픽셀 차이를 비교한다.
+
+    python benchmark_resize.py --panels 12 --width 1024 --repeat 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# main 임포트 전에 저장 경로를 임시 디렉토리로 돌린다
+os.environ["IMAGE_STORAGE_DIR"] = tempfile.mkdtemp(prefix="toonverse_bench_")
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from PIL import Image, ImageChops, ImageStat  # noqa: E402
+
+import main  # noqa: E402
+
+# (폭 배율, 포맷) - 기준 폭 대비
+PANEL_MIX = [
+    (1.0, "PNG"),
+    (2.0, "PNG"),
+    (1.5, "PNG"),
+    (4.0, "JPEG"),
+    (0.75, "PNG"),
+    (4.0, "PNG"),
+]
+
+
+def make_panels(count: int, width: int):
+    paths = []
+    for i in range(count):
+        scale, fmt = PANEL_MIX[i % len(PANEL_MIX)]
+        size = (int(width * scale), int(width * scale * 1.75))
+        # 노이즈 위에 그라데이션을 깔아 리샘플링 차이가 드러나게 함
+        base = Image.linear_gradient('L').resize(size).convert('RGB')
+        noise = Image.effect_noise(size, 30).convert('RGB')
+        image = Image.blend(base, noise, 0.5)
+        path = os.path.join(main.STORAGE_DIR, f"bench_panel_{i + 1:03d}.{fmt.lower()}")
+        image.save(path, fmt, **({"quality": 90} if fmt == "JPEG" else {"compress_level": 1}))
+        paths.append(path)
+    return paths
+
+
+def merge_vertical_legacy(images, spacing: int = 10):
+    """변경 전 merge_vertical과 같은 방식 (항상 원본 해상도에서 LANCZOS)"""
+    target_width = images[0].width
+    resized = []
+    for img in images:
+        if img.width != target_width:
+            new_height = int(img.height * target_width / img.width)
+            img = img.resize((target_width, new_height), Image.Resampling.LANCZOS)
+        resized.append(img)
+
+    total_height = sum(img.height for img in resized) + spacing * (len(resized) - 1)
+    final_image = Image.new('RGB', (target_width, total_height), (255, 255, 255))
+    y_offset = 0
+    for img in resized:
+        final_image.paste(img, (0, y_offset))
+        y_offset += img.height + spacing
+    return final_image
+
+
+def mean_abs_diff(a: Image.Image, b: Image.Image) -> float:
+    return sum(ImageStat.Stat(ImageChops.difference(a, b)).mean) / 3
+
+
+def timed(fn, paths, repeat: int):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn([Image.open(path) for path in paths])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(panels: int, width: int, repeat: int):
+    paths = make_panels(panels, width)
+    print(f"panels={panels} base_width={width} mix={[f'{s}x {f}' for s, f in PANEL_MIX]}")
+    print(f"{'method':>10} {'best_s':>8} {'speedup':>8} {'mean_abs_diff':>14}")
+
+    legacy_time, legacy = timed(merge_vertical_legacy, paths, repeat)
+    print(f"{'legacy':>10} {legacy_time:>8.2f} {1.0:>7.1f}x {0.0:>14.3f}")
+
+    for mode in main.RESIZE_MODES:
+        elapsed, result = timed(lambda images: main.merge_vertical(images, 10, mode), paths, repeat)
+        assert result.size == legacy.size, "merged size changed"
+        print(f"{mode:>10} {elapsed:>8.2f} {legacy_time / elapsed:>7.1f}x {mean_abs_diff(result, legacy):>14.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Packaging resize benchmark on mixed-size panels")
+    parser.add_argument("--panels", type=int, default=12)
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run(args.panels, args.width, args.repeat)
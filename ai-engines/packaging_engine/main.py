@@ -1,11 +1,30 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import os
+import sys
+import json
 import time
+import zlib
+import struct
+import resource
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
-from PIL import Image
+from functools import lru_cache
+from PIL import Image, ImageChops
+from pathlib import Path
+
+# 공통 모듈 (ai-engines 디렉토리 기준 임포트)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.assets import asset_endpoint, install_asset_routes  # noqa: E402
+from common.jobs import JobManager  # noqa: E402
+from common.metrics import CACHE_HITS, CACHE_MISSES, IMAGE_BYTES_WRITTEN, install_metrics  # noqa: E402
+from common.storage import AssetStorage, atomic_path, hash_file, shard_path  # noqa: E402
+from common.tracing import begin_trace, bind_trace, install_tracing, span, trace_metadata  # noqa: E402
 
 app = FastAPI(
     title="TOONVERSE Packaging Engine",
@@ -22,10 +41,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 이미지 저장 디렉토리
+# 이미지 저장 디렉토리 (최종 결과물은 에피소드별 디렉토리, 축소본은 원본 해시로 분산)
 STORAGE_DIR = os.getenv("IMAGE_STORAGE_DIR", "/var/www/toonverse/webapp/storage/images")
-FINAL_DIR = os.path.join(STORAGE_DIR, "final")
-os.makedirs(FINAL_DIR, exist_ok=True)
+storage = AssetStorage(STORAGE_DIR)
+FINAL_DIR = storage.episode_dir
+DERIVATIVE_DIR = os.path.join(STORAGE_DIR, "derivatives")
+os.makedirs(DERIVATIVE_DIR, exist_ok=True)
+
+# 스트리밍 합성 시 한 번에 필터링/압축하는 행 수와 IDAT 청크 크기
+STREAM_BAND_ROWS = 256
+STREAM_IDAT_BYTES = 256 * 1024
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# 분할(세그먼트) 출력 기본 높이와 병렬 기록 스레드 수
+DEFAULT_SEGMENT_HEIGHT = 1280
+SEGMENT_WRITE_WORKERS = int(os.getenv("PACKAGING_SEGMENT_WORKERS", "4"))
+
+# 출력 포맷별 Pillow 저장 옵션 (quality_preset: low, balanced, high)
+ENCODER_PRESETS = {
+    "png": {
+        "low": {"compress_level": 1},
+        "balanced": {"compress_level": 6},
+        "high": {"compress_level": 9},
+    },
+    "webp": {
+        "low": {"quality": 65, "method": 4},
+        "balanced": {"quality": 80, "method": 4},
+        "high": {"quality": 92, "method": 6},
+    },
+    "jpeg": {
+        "low": {"quality": 70, "progressive": True, "optimize": True, "subsampling": 2},
+        "balanced": {"quality": 85, "progressive": True, "optimize": True, "subsampling": 2},
+        "high": {"quality": 95, "progressive": True, "optimize": True, "subsampling": 0},
+    },
+    "avif": {
+        "low": {"quality": 50, "speed": 8},
+        "balanced": {"quality": 65, "speed": 6},
+        "high": {"quality": 80, "speed": 4},
+    },
+}
+FORMAT_ALIASES = {"jpg": "jpeg"}
+FORMAT_EXTENSIONS = {"png": "png", "webp": "webp", "jpeg": "jpg", "avif": "avif"}
+FORMAT_MAX_DIMENSION = {"webp": 16383, "jpeg": 65535}  # 넘으면 output_mode=segmented 사용
+
+# 패널 크기 맞춤 방식 (quality: reduce 후 2배 여유를 두고 LANCZOS, fast: reduce 후 BILINEAR)
+RESIZE_MODES = {
+    "quality": {"filter": Image.Resampling.LANCZOS, "reducing_gap": 2.0},
+    "fast": {"filter": Image.Resampling.BILINEAR, "reducing_gap": 1.0},
+}
+DEFAULT_RESIZE_MODE = os.getenv("PACKAGING_RESIZE_MODE", "quality")
+
+# 그리드 셀 리사이즈 병렬 스레드 수 (Pillow resize는 GIL을 놓고 실행)
+GRID_RESIZE_WORKERS = int(os.getenv("PACKAGING_RESIZE_WORKERS", "4"))
+
+# 요청별 메모리 측정 시 현재 RSS를 읽는 간격 (초)
+RSS_SAMPLE_INTERVAL = float(os.getenv("PACKAGING_RSS_SAMPLE_INTERVAL", "0.01"))
+
+# 갤러리용 축소본 종류별 목표 너비 (px)
+DERIVATIVE_VARIANTS = {
+    "thumbnail": 240,
+    "preview": 720,
+    "retina": 1440,
+}
 
 class PanelInfo(BaseModel):
     panel_number: int
@@ -35,7 +112,23 @@ class PackagingRequest(BaseModel):
     episode_id: int
     panels: List[PanelInfo]
     layout: str = "vertical"  # vertical, grid
-    spacing: int = 10  # 패널 간 간격 (px)
+    spacing: int = 10  # 패널 간 간격 (px), grid에서는 행/열 거터
+    columns: int = 2  # grid: 한 행의 패널 수
+    page_width: Optional[int] = None  # grid: 페이지 폭 (기본값: 첫 패널 폭 x columns + 거터)
+    streaming: bool = False  # vertical: 전체 캔버스 없이 행 단위로 PNG 기록
+    output_mode: str = "single"  # single: 한 장의 PNG, segmented: 고정 높이 조각 + manifest
+    segment_height: int = DEFAULT_SEGMENT_HEIGHT
+    output_formats: List[str] = ["png"]  # png, webp, jpeg(progressive), avif (Pillow 지원 시)
+    quality_preset: str = "balanced"  # low, balanced, high
+    resize_mode: str = DEFAULT_RESIZE_MODE  # quality, fast
+    trace: bool = False  # 단계별 소요 시간을 metadata.timings로 반환
+
+class DerivativeRequest(BaseModel):
+    image_paths: List[str]
+    variants: List[str] = list(DERIVATIVE_VARIANTS)  # thumbnail, preview, retina
+    output_format: str = "webp"  # png, webp, jpeg, avif
+    quality_preset: str = "balanced"  # low, balanced, high
+    trace: bool = False  # 단계별 소요 시간을 metadata.timings로 반환
 
 class PackagingResponse(BaseModel):
     success: bool
@@ -62,11 +155,17 @@ def health_check():
         "service": "packaging_engine",
         "storage_dir": FINAL_DIR,
         "storage_writable": storage_writable,
+        "derivative_dir": DERIVATIVE_DIR,
+        "jobs": jobs.stats(),
         "timestamp": datetime.now().isoformat(),
         "endpoints": [
             "/",
             "/health",
-            "/engine/pack/webtoon"
+            "/engine/pack/webtoon",
+            "/engine/pack/derivatives",
+            *jobs.endpoints("/engine/pack"),
+            asset_endpoint("/engine/pack"),
+            "/metrics"
         ]
     }
 
@@ -75,36 +174,109 @@ def package_webtoon(request: PackagingRequest):
     """
     여러 패널을 하나의 웹툰 이미지로 병합
     """
+    # 스트리밍 기록은 PNG 전용 (다른 포맷은 전체 캔버스가 필요하므로 조용히 바꾸지 않고 거절)
+    if request.streaming and request.output_mode != "segmented" and request.layout != "grid":
+        requested = {FORMAT_ALIASES.get(fmt.lower(), fmt.lower()) for fmt in request.output_formats or ["png"]}
+        if requested != {"png"}:
+            raise HTTPException(
+                status_code=400,
+                detail="streaming supports only png output; use output_mode=segmented for other formats"
+            )
+    
     start_time = time.time()
+    begin_trace("pack.webtoon", request.trace)
+    rss = RssSampler().start()
     
     try:
         if not request.panels:
             raise ValueError("No panels provided")
         
-        # 패널 이미지 로드
-        panel_images = []
+        # 패널 파일 확인
+        panel_paths = []
         for panel in request.panels:
             if not os.path.exists(panel.lettered_image_url):
                 raise FileNotFoundError(f"Panel image not found: {panel.lettered_image_url}")
+            panel_paths.append(panel.lettered_image_url)
+        
+        formats, skipped = resolve_output_formats(request.output_formats, request.quality_preset)
+        if request.resize_mode not in RESIZE_MODES:
+            raise ValueError(f"Unknown resize_mode: {request.resize_mode}")
+        if request.columns < 1:
+            raise ValueError("columns must be at least 1")
+        segments = None
+        outputs = []
+        
+        if request.output_mode == "segmented":
+            if request.segment_height <= 0:
+                raise ValueError("segment_height must be positive")
+            
+            # 고정 높이 조각으로 나눠 병렬 기록 + manifest
+            segment_dir = storage.episode_path(request.episode_id, "segments")
+            if request.layout == "grid":
+                final_image = compose_panels(
+                    panel_paths, request.layout, request.spacing, request.resize_mode,
+                    request.columns, request.page_width
+                )
+                width, height = final_image.size
+                segments = slice_segments(
+                    final_image, segment_dir, request.segment_height, formats, request.quality_preset
+                )
+                compose_mode = "canvas"
+            else:
+                width, height, segments = compose_vertical_segments(
+                    panel_paths, segment_dir, request.spacing, request.segment_height,
+                    formats, request.quality_preset, request.resize_mode
+                )
+                compose_mode = "streaming"
+            output_path = write_segment_manifest(
+                segment_dir, request.episode_id, width, height, request.segment_height, segments
+            )
+            file_size_bytes = sum(segment["file_size"] for segment in segments)
+            encodings = summarize_segment_encodings(segments)
+        elif request.streaming and request.layout != "grid":
+            output_path = final_output_path(request.episode_id, "png")
             
-            img = Image.open(panel.lettered_image_url)
-            panel_images.append(img)
-        
-        # 레이아웃에 따라 병합
-        if request.layout == "vertical":
-            final_image = merge_vertical(panel_images, request.spacing)
-        elif request.layout == "grid":
-            final_image = merge_grid(panel_images, request.spacing)
+            # 패널을 하나씩 읽어 행 단위로 바로 인코딩 (메모리 사용량 일정)
+            encode_start = time.time()
+            width, height = compose_vertical_streaming(
+                panel_paths, output_path, request.spacing,
+                ENCODER_PRESETS["png"][request.quality_preset]["compress_level"],
+                request.resize_mode
+            )
+            file_size_bytes = os.path.getsize(output_path)
+            outputs = [{"format": "png", "url": output_path, "file_size": file_size_bytes}]
+            encodings = {"png": {"file_size": file_size_bytes, "encode_time": round(time.time() - encode_start, 3)}}
+            compose_mode = "streaming"
         else:
-            final_image = merge_vertical(panel_images, request.spacing)
-        
-        # 최종 이미지 저장
-        filename = f"episode_{request.episode_id:03d}_final.png"
-        output_path = os.path.join(FINAL_DIR, filename)
-        final_image.save(output_path, 'PNG')
+            # 헤더만 읽어 레이아웃 계산 후 패널을 한 장씩 디코딩해 병합
+            final_image = compose_panels(
+                panel_paths, request.layout, request.spacing, request.resize_mode,
+                request.columns, request.page_width
+            )
+            width, height = final_image.size
+            
+            # 요청한 포맷별로 최종 이미지 저장
+            encodings = {}
+            for fmt in formats:
+                try:
+                    output = encode_image(
+                        final_image, fmt, request.quality_preset, final_output_path(request.episode_id, fmt)
+                    )
+                except Exception as e:
+                    encodings[fmt] = {"error": str(e)}
+                    continue
+                outputs.append(output)
+                encodings[fmt] = {"file_size": output["file_size"], "encode_time": output["encode_time"]}
+            
+            if not outputs:
+                raise ValueError(f"All output encodings failed: {encodings}")
+            output_path = outputs[0]["url"]
+            file_size_bytes = outputs[0]["file_size"]
+            compose_mode = "canvas"
         
         # 파일 크기 계산
-        file_size_mb = os.path.getsize(output_path) / (1024 * 1024)
+        file_size_mb = file_size_bytes / (1024 * 1024)
+        rss.stop()
         
         processing_time = time.time() - start_time
         
@@ -113,92 +285,856 @@ def package_webtoon(request: PackagingRequest):
             result={
                 "episode_id": request.episode_id,
                 "final_webtoon_url": output_path,
-                "width": final_image.width,
-                "height": final_image.height,
-                "total_panels": len(panel_images),
-                "file_size_mb": round(file_size_mb, 2)
+                "width": width,
+                "height": height,
+                "total_panels": len(panel_paths),
+                "file_size_mb": round(file_size_mb, 2),
+                "output_mode": request.output_mode,
+                **({"manifest_url": output_path, "segments": segments} if segments is not None else {"outputs": outputs})
             },
             metadata={
                 "engine_version": "1.0.0",
                 "cost_units": 0.0,
                 "processing_time": round(processing_time, 2),
-                "layout": request.layout
+                "layout": request.layout,
+                **({"columns": request.columns} if request.layout == "grid" else {}),
+                "compose_mode": compose_mode,
+                "quality_preset": request.quality_preset,
+                "resize_mode": request.resize_mode,
+                "encodings": {**encodings, **skipped},
+                **rss.stats(),
+                **trace_metadata()
             }
         )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        rss.stop()
+
+@app.post("/engine/pack/derivatives", response_model=PackagingResponse)
+def create_derivatives(request: DerivativeRequest):
+    """
+    패널/최종 이미지의 축소본(thumbnail, preview, retina) 생성
+    
+    원본 내용 해시 기준으로 디스크에 캐시하고, 원본이 바뀐 경우에만 다시 생성
+    """
+    start_time = time.time()
+    begin_trace("pack.derivatives", request.trace)
+    
+    try:
+        if not request.image_paths:
+            raise ValueError("No images provided")
         
+        unknown = [name for name in request.variants if name not in DERIVATIVE_VARIANTS]
+        if unknown:
+            raise ValueError(f"Unknown derivative variants: {unknown}")
+        formats, _ = resolve_output_formats([request.output_format], request.quality_preset)
+        fmt = formats[0]
+        
+        for path in request.image_paths:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Image not found: {path}")
+        
+        images = [
+            generate_derivatives(path, request.variants, fmt, request.quality_preset)
+            for path in request.image_paths
+        ]
+        
+        variants = [variant for image in images for variant in image["variants"].values()]
+        cache_hits = sum(1 for variant in variants if variant["cached"])
+        
+        processing_time = time.time() - start_time
+        
+        return PackagingResponse(
+            success=True,
+            result={
+                "images": images,
+                "total_images": len(images)
+            },
+            metadata={
+                "engine_version": "1.0.0",
+                "cost_units": 0.0,
+                "processing_time": round(processing_time, 2),
+                "output_format": fmt,
+                "quality_preset": request.quality_preset,
+                "generated": len(variants) - cache_hits,
+                "cache_hits": cache_hits,
+                **trace_metadata()
+            }
+        )
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def merge_vertical(images: List[Image.Image], spacing: int = 10) -> Image.Image:
+def merge_panels(
+    images: List[Image.Image],
+    layout: str = "vertical",
+    spacing: int = 10,
+    resize_mode: str = DEFAULT_RESIZE_MODE,
+    columns: int = 2,
+    page_width: Optional[int] = None
+) -> Image.Image:
+    """
+    레이아웃에 따라 패널 병합 (알 수 없는 레이아웃은 세로)
+    """
+    if layout == "grid":
+        return merge_grid(images, spacing, columns, resize_mode, page_width)
+    return merge_vertical(images, spacing, resize_mode)
+
+def merge_vertical(images: List[Image.Image], spacing: int = 10, resize_mode: str = DEFAULT_RESIZE_MODE) -> Image.Image:
     """
     세로로 이미지 병합
     """
     if not images:
         raise ValueError("No images to merge")
     
-    # 모든 이미지의 너비를 첫 번째 이미지 너비로 맞춤
-    target_width = images[0].width
-    resized_images = []
-    
-    for img in images:
-        if img.width != target_width:
-            # 비율 유지하며 리사이즈
-            ratio = target_width / img.width
-            new_height = int(img.height * ratio)
-            img = img.resize((target_width, new_height), Image.Resampling.LANCZOS)
-        resized_images.append(img)
-    
-    # 전체 높이 계산 (간격 포함)
-    total_height = sum(img.height for img in resized_images) + spacing * (len(resized_images) - 1)
+    # 모든 이미지의 너비를 첫 번째 이미지 너비로 맞춤 (비율 유지)
+    target_width, total_height, cells = compute_vertical_layout([img.size for img in images], spacing)
     
     # 새 이미지 생성 (흰색 배경)
     final_image = Image.new('RGB', (target_width, total_height), (255, 255, 255))
     
     # 이미지 붙여넣기
-    y_offset = 0
-    for img in resized_images:
-        final_image.paste(img, (0, y_offset))
-        y_offset += img.height + spacing
+    for (x, y, width, height), img in zip(cells, images):
+        img = resize_image(img, (width, height), resize_mode)
+        with span("paste"):
+            final_image.paste(img, (x, y))
     
     return final_image
 
-def merge_grid(images: List[Image.Image], spacing: int = 10, columns: int = 2) -> Image.Image:
+def compose_panels(
+    panel_paths: List[str],
+    layout: str = "vertical",
+    spacing: int = 10,
+    resize_mode: str = DEFAULT_RESIZE_MODE,
+    columns: int = 2,
+    page_width: Optional[int] = None
+) -> Image.Image:
     """
-    그리드 형식으로 이미지 병합
+    파일 경로 기준 2단계 병합
+    
+    1단계: 헤더만 읽어 패널 크기와 레이아웃(캔버스 크기) 계산
+    2단계: 패널을 한 장씩 디코딩/리사이즈해 붙여넣고 바로 닫음
     """
-    if not images:
+    sizes = probe_panel_sizes(panel_paths)
+    if layout == "grid":
+        width, height, cells = compute_grid_layout(sizes, columns, spacing, page_width)
+    else:
+        width, height, cells = compute_vertical_layout(sizes, spacing)
+    
+    final_image = Image.new('RGB', (width, height), (255, 255, 255))
+    for (x, y, _, _), img in zip(cells, iter_fitted_panels(panel_paths, cells, resize_mode)):
+        with span("paste"):
+            final_image.paste(img, (x, y))
+        img.close()
+    
+    return final_image
+
+def probe_panel_sizes(panel_paths: List[str]) -> List[tuple]:
+    """
+    패널 헤더만 읽어 크기 확인 (픽셀 데이터는 디코딩하지 않음)
+    """
+    if not panel_paths:
         raise ValueError("No images to merge")
     
-    # 그리드 크기 계산
-    rows = (len(images) + columns - 1) // columns
+    sizes = []
+    with span("probe"):
+        for path in panel_paths:
+            with Image.open(path) as img:
+                sizes.append(img.size)
+    return sizes
+
+def compute_vertical_layout(sizes: List[tuple], spacing: int = 10) -> tuple:
+    """
+    세로 레이아웃 계산 (폭, 전체 높이, 셀별 (x, y, 폭, 높이))
+    """
+    target_width = sizes[0][0]
+    cells = []
+    y = 0
+    for w, h in sizes:
+        height = h if w == target_width else int(h * target_width / w)
+        cells.append((0, y, target_width, height))
+        y += height + spacing
     
-    # 각 셀의 크기 (첫 번째 이미지 기준)
-    cell_width = images[0].width
-    cell_height = images[0].height
+    return target_width, y - spacing, cells
+
+def iter_fitted_panels(
+    panel_paths: List[str],
+    cells: List[tuple],
+    resize_mode: str = DEFAULT_RESIZE_MODE,
+    workers: int = GRID_RESIZE_WORKERS
+):
+    """
+    셀 크기에 맞춘 패널을 순서대로 생성
     
-    # 전체 크기 계산
-    total_width = cell_width * columns + spacing * (columns - 1)
-    total_height = cell_height * rows + spacing * (rows - 1)
+    디코딩/리사이즈는 스레드 풀에서 앞서 진행하되 동시에 메모리에 있는 패널은 workers장 이하
+    """
+    load = bind_trace(load_fitted_panel)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for path, cell in zip(panel_paths, cells):
+            pending.append(executor.submit(load, path, cell[2:], resize_mode))
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def load_fitted_panel(path: str, size: tuple, resize_mode: str = DEFAULT_RESIZE_MODE) -> Image.Image:
+    """
+    패널 하나를 디코딩해 셀 크기로 맞춤 (원본 파일과 원본 해상도 버퍼는 바로 해제)
+    """
+    source = Image.open(path)
+    img = resize_image(source, size, resize_mode)
+    if img is source:
+        # 크기가 같아 resize_image가 디코딩하지 않은 경우
+        with span("decode"):
+            img.load()
+    else:
+        source.close()
+    return img
+
+def compose_vertical_streaming(
+    panel_paths: List[str],
+    output_path: str,
+    spacing: int = 10,
+    compress_level: int = 6,
+    resize_mode: str = DEFAULT_RESIZE_MODE
+) -> tuple:
+    """
+    세로 병합 결과를 PNG로 스트리밍 기록
     
-    # 새 이미지 생성
-    final_image = Image.new('RGB', (total_width, total_height), (255, 255, 255))
+    패널 크기만 먼저 읽어 전체 높이를 정한 뒤, 패널을 하나씩 디코딩해
+    STREAM_BAND_ROWS 행 단위로 Sub 필터 + zlib 압축하여 IDAT 청크로 내보낸다.
+    전체 캔버스를 만들지 않으므로 메모리는 패널 1장 + 압축 버퍼 수준으로 유지된다.
+    (merge_vertical과 같은 결과)
+    """
+    # 1단계: 헤더만 읽어 크기 계산
+    target_width, heights, total_height = probe_vertical_layout(panel_paths, spacing)
     
-    # 이미지 배치
-    for idx, img in enumerate(images):
-        row = idx // columns
-        col = idx % columns
+    compressor = zlib.compressobj(compress_level)
+    with atomic_path(output_path) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            f.write(PNG_SIGNATURE)
+            write_png_chunk(f, b"IHDR", struct.pack(">IIBBBBB", target_width, total_height, 8, 2, 0, 0, 0))
+            
+            pending = []
+            pending_bytes = 0
+            
+            def emit(raw: bytes):
+                nonlocal pending_bytes
+                with span("compress"):
+                    compressed = compressor.compress(raw)
+                if compressed:
+                    pending.append(compressed)
+                    pending_bytes += len(compressed)
+                if pending_bytes >= STREAM_IDAT_BYTES:
+                    with span("write"):
+                        write_png_chunk(f, b"IDAT", b"".join(pending))
+                    pending.clear()
+                    pending_bytes = 0
+            
+            # 2단계: 패널을 하나씩 디코딩 → 리사이즈 → 행 단위 인코딩
+            for band in iter_vertical_bands(panel_paths, target_width, heights, spacing, resize_mode):
+                with span("filter"):
+                    raw = sub_filter_rows(band)
+                emit(raw)
+            
+            with span("compress"):
+                pending.append(compressor.flush())
+            with span("write"):
+                write_png_chunk(f, b"IDAT", b"".join(pending))
+                write_png_chunk(f, b"IEND", b"")
+    
+    IMAGE_BYTES_WRITTEN.inc(os.path.getsize(output_path), format="png")
+    return target_width, total_height
+
+def probe_vertical_layout(panel_paths: List[str], spacing: int = 10) -> tuple:
+    """
+    패널 헤더만 읽어 세로 레이아웃 계산 (폭, 패널별 높이, 전체 높이)
+    """
+    target_width, total_height, cells = compute_vertical_layout(probe_panel_sizes(panel_paths), spacing)
+    
+    return target_width, [cell[3] for cell in cells], total_height
+
+def iter_vertical_bands(
+    panel_paths: List[str],
+    target_width: int,
+    heights: List[int],
+    spacing: int = 10,
+    resize_mode: str = DEFAULT_RESIZE_MODE
+):
+    """
+    세로 병합 결과를 위에서부터 최대 STREAM_BAND_ROWS 행짜리 RGB 띠로 생성
+    
+    패널은 한 번에 하나만 디코딩하고, 간격은 흰색 띠로 채운다
+    """
+    for index, (path, height) in enumerate(zip(panel_paths, heights)):
+        if index > 0 and spacing > 0:
+            yield Image.new('RGB', (target_width, spacing), (255, 255, 255))
+        
+        with Image.open(path) as source:
+            # JPEG 원본은 resize_image가 draft로 축소 디코딩
+            img = resize_image(source, (target_width, height), resize_mode)
+            # 크기가 같아 resize_image를 그대로 통과한 패널은 여기서 디코딩됨
+            with span("decode" if img is source else "convert"):
+                img = img.convert('RGB')
         
-        x = col * (cell_width + spacing)
-        y = row * (cell_height + spacing)
+        for top in range(0, height, STREAM_BAND_ROWS):
+            yield img.crop((0, top, target_width, min(top + STREAM_BAND_ROWS, height)))
+        img.close()
+
+def compose_vertical_segments(
+    panel_paths: List[str],
+    segment_dir: str,
+    spacing: int = 10,
+    segment_height: int = DEFAULT_SEGMENT_HEIGHT,
+    formats: Optional[List[str]] = None,
+    quality_preset: str = "balanced",
+    resize_mode: str = DEFAULT_RESIZE_MODE
+) -> tuple:
+    """
+    세로 병합 결과를 segment_height 높이의 조각으로 나눠 기록 (전체 캔버스 없음)
+    
+    조각이 다 차는 대로 스레드 풀에서 PNG 인코딩/기록 (진행 중 조각 수 제한)
+    """
+    formats = formats or ["png"]
+    target_width, heights, total_height = probe_vertical_layout(panel_paths, spacing)
+    os.makedirs(segment_dir, exist_ok=True)
+    
+    segments = []
+    futures = []
+    canvas = None
+    filled = 0
+    offset_y = 0
+    
+    write = bind_trace(write_segment)
+    with ThreadPoolExecutor(max_workers=SEGMENT_WRITE_WORKERS, thread_name_prefix="segment") as executor:
+        for band in iter_vertical_bands(panel_paths, target_width, heights, spacing, resize_mode):
+            top = 0
+            while top < band.height:
+                if canvas is None:
+                    canvas = Image.new('RGB', (target_width, min(segment_height, total_height - offset_y)), (255, 255, 255))
+                    filled = 0
+                
+                rows = min(band.height - top, canvas.height - filled)
+                with span("paste"):
+                    canvas.paste(band.crop((0, top, target_width, top + rows)), (0, filled))
+                filled += rows
+                top += rows
+                
+                if filled == canvas.height:
+                    in_flight = [future for future in futures if not future.done()]
+                    if len(in_flight) >= SEGMENT_WRITE_WORKERS * 2:
+                        wait(in_flight, return_when=FIRST_COMPLETED)
+                    segments.append(None)
+                    futures.append(executor.submit(
+                        write, canvas, segment_dir, len(segments) - 1, offset_y, segments,
+                        formats, quality_preset
+                    ))
+                    offset_y += canvas.height
+                    canvas = None
+    
+    # 기록 중 발생한 예외 전파
+    for future in futures:
+        future.result()
+    
+    return target_width, total_height, segments
+
+def slice_segments(
+    image: Image.Image,
+    segment_dir: str,
+    segment_height: int = DEFAULT_SEGMENT_HEIGHT,
+    formats: Optional[List[str]] = None,
+    quality_preset: str = "balanced"
+) -> List[Dict[str, Any]]:
+    """
+    완성된 이미지를 segment_height 높이의 조각으로 잘라 병렬 기록
+    """
+    formats = formats or ["png"]
+    os.makedirs(segment_dir, exist_ok=True)
+    offsets = list(range(0, image.height, segment_height))
+    segments: List[Optional[Dict[str, Any]]] = [None] * len(offsets)
+    write = bind_trace(write_segment)
+    
+    with ThreadPoolExecutor(max_workers=SEGMENT_WRITE_WORKERS, thread_name_prefix="segment") as executor:
+        futures = [
+            executor.submit(
+                write,
+                image.crop((0, offset_y, image.width, min(offset_y + segment_height, image.height))),
+                segment_dir,
+                index,
+                offset_y,
+                segments,
+                formats,
+                quality_preset
+            )
+            for index, offset_y in enumerate(offsets)
+        ]
+    
+    # 기록 중 발생한 예외 전파
+    for future in futures:
+        future.result()
+    
+    return segments
+
+def write_segment(
+    image: Image.Image,
+    segment_dir: str,
+    index: int,
+    offset_y: int,
+    segments: List[Any],
+    formats: Optional[List[str]] = None,
+    quality_preset: str = "balanced"
+):
+    """
+    조각 하나를 요청 포맷별로 기록하고 manifest 항목을 segments[index]에 채움
+    (url/file_size는 첫 번째 포맷 기준, variants에 포맷별 결과)
+    """
+    formats = formats or ["png"]
+    variants = {}
+    for fmt in formats:
+        path = os.path.join(segment_dir, f"segment_{index:03d}.{FORMAT_EXTENSIONS[fmt]}")
+        output = encode_image(image, fmt, quality_preset, path)
+        variants[fmt] = {
+            "url": output["url"],
+            "file_size": output["file_size"],
+            "encode_time": output["encode_time"]
+        }
+    
+    primary = variants[formats[0]]
+    segments[index] = {
+        "index": index,
+        "url": primary["url"],
+        "offset_y": offset_y,
+        "width": image.width,
+        "height": image.height,
+        "file_size": primary["file_size"],
+        "variants": variants
+    }
+
+def summarize_segment_encodings(segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    조각별 인코딩 결과를 포맷별 합계로 요약
+    """
+    encodings = {}
+    for segment in segments:
+        for fmt, variant in segment["variants"].items():
+            total = encodings.setdefault(fmt, {"file_size": 0, "encode_time": 0.0})
+            total["file_size"] += variant["file_size"]
+            total["encode_time"] = round(total["encode_time"] + variant["encode_time"], 3)
+    return encodings
+
+def resolve_output_formats(
+    formats: List[str],
+    quality_preset: str
+) -> Tuple[List[str], Dict[str, Dict[str, str]]]:
+    """
+    요청 포맷 정규화/검증 (별칭 처리, 중복 제거, Pillow 지원 여부 확인)
+    
+    이 Pillow 빌드가 저장하지 못하는 포맷(예: AVIF)은 요청 전체를 실패시키지 않고 건너뛰며,
+    (인코딩할 포맷, metadata.encodings에 합칠 건너뛴 포맷) 반환. 남는 포맷이 없으면 ValueError
+    """
+    if quality_preset not in ENCODER_PRESETS["png"]:
+        raise ValueError(f"Unknown quality_preset: {quality_preset}")
+    
+    resolved = []
+    skipped = {}
+    for fmt in formats or ["png"]:
+        fmt = FORMAT_ALIASES.get(fmt.lower(), fmt.lower())
+        if fmt not in ENCODER_PRESETS:
+            raise ValueError(f"Unsupported output format: {fmt}")
+        if not is_format_available(fmt):
+            skipped[fmt] = {"skipped": "not supported by this Pillow build"}
+        elif fmt not in resolved:
+            resolved.append(fmt)
+    
+    if not resolved:
+        raise ValueError(f"Output format not supported by this Pillow build: {', '.join(skipped)}")
+    return resolved, skipped
+
+def is_format_available(fmt: str) -> bool:
+    """
+    Pillow 빌드가 해당 포맷 저장을 지원하는지 확인
+    """
+    Image.init()
+    return fmt.upper() in Image.SAVE
+
+def encode_image(image: Image.Image, fmt: str, quality_preset: str, path: str) -> Dict[str, Any]:
+    """
+    포맷/품질 프리셋에 맞춰 이미지 저장 후 크기와 인코딩 시간 반환
+    """
+    max_dimension = FORMAT_MAX_DIMENSION.get(fmt)
+    if max_dimension and max(image.size) > max_dimension:
+        raise ValueError(
+            f"{fmt} supports at most {max_dimension}px per side (image is {image.width}x{image.height}); "
+            "use output_mode=segmented"
+        )
+    
+    # 동시 요청이 같은 파일을 쓰더라도 완성된 파일만 보이도록 임시 파일 후 rename
+    start = time.time()
+    with span("encode"), atomic_path(path) as tmp_path:
+        image.save(tmp_path, fmt.upper(), **ENCODER_PRESETS[fmt][quality_preset])
+    
+    file_size = os.path.getsize(path)
+    IMAGE_BYTES_WRITTEN.inc(file_size, format=fmt)
+    return {
+        "format": fmt,
+        "url": path,
+        "file_size": file_size,
+        "encode_time": round(time.time() - start, 3)
+    }
+
+def write_segment_manifest(
+    segment_dir: str,
+    episode_id: int,
+    width: int,
+    height: int,
+    segment_height: int,
+    segments: List[Dict[str, Any]]
+) -> str:
+    """
+    조각 목록(manifest.json) 기록 후 이전 실행에서 남은 조각 정리
+    """
+    manifest = {
+        "episode_id": episode_id,
+        "width": width,
+        "height": height,
+        "segment_height": segment_height,
+        "segments": segments
+    }
+    manifest_path = os.path.join(segment_dir, "manifest.json")
+    with atomic_path(manifest_path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+    
+    current = {
+        os.path.basename(variant["url"])
+        for segment in segments
+        for variant in segment["variants"].values()
+    }
+    for name in os.listdir(segment_dir):
+        if name.startswith("segment_") and not name.endswith(".part") and name not in current:
+            os.remove(os.path.join(segment_dir, name))
+    
+    return manifest_path
+
+def generate_derivatives(path: str, variants: List[str], fmt: str, quality_preset: str) -> Dict[str, Any]:
+    """
+    원본 하나에 대한 축소본 생성 (이미 있는 축소본은 재사용)
+    
+    원본은 최대 한 번만 디코딩하고, 큰 축소본부터 만들어 다음 축소본의 입력으로 사용
+    """
+    with span("hash"):
+        content_hash = get_content_hash(path)
+    targets = {
+        name: derivative_path(content_hash, name, fmt, quality_preset)
+        for name in sorted(set(variants), key=lambda name: -DERIVATIVE_VARIANTS[name])
+    }
+    results = {}
+    
+    missing = [name for name, target in targets.items() if not os.path.exists(target)]
+    CACHE_HITS.inc(len(targets) - len(missing), cache="derivatives")
+    CACHE_MISSES.inc(len(missing), cache="derivatives")
+    if missing:
+        with Image.open(path) as source:
+            # JPEG 원본은 디코딩 단계에서 1/2~1/8로 줄여 읽음
+            largest = DERIVATIVE_VARIANTS[missing[0]]
+            source.draft("RGB", (largest, max(1, source.height * largest // source.width)))
+            
+            with span("decode"):
+                image = source.convert("RGB" if source.mode not in ("RGB", "RGBA") or fmt == "jpeg" else source.mode)
+            for name in missing:
+                image = downscale_to_width(image, DERIVATIVE_VARIANTS[name])
+                output = encode_image(image, fmt, quality_preset, targets[name])
+                results[name] = {
+                    "url": targets[name],
+                    "width": image.width,
+                    "height": image.height,
+                    "file_size": output["file_size"],
+                    "cached": False
+                }
+    
+    for name, target in targets.items():
+        if name in results:
+            continue
+        with Image.open(target) as cached:
+            width, height = cached.size
+        results[name] = {
+            "url": target,
+            "width": width,
+            "height": height,
+            "file_size": os.path.getsize(target),
+            "cached": True
+        }
+    
+    return {
+        "source": path,
+        "content_hash": content_hash,
+        "variants": {name: results[name] for name in variants if name in results}
+    }
+
+def downscale_to_width(image: Image.Image, width: int) -> Image.Image:
+    """
+    비율 유지하며 목표 너비로 축소 (확대는 하지 않음)
+    """
+    if image.width <= width:
+        return image
+    
+    height = max(1, round(image.height * width / image.width))
+    return resize_image(image, (width, height), "quality")
+
+def resize_image(image: Image.Image, size: tuple, resize_mode: str = DEFAULT_RESIZE_MODE) -> Image.Image:
+    """
+    가장 싼 경로로 크기 맞춤
+    
+    - 크기가 같으면 그대로 반환
+    - 아직 디코딩 전인 JPEG는 draft로 1/2~1/8 축소 디코딩
+    - 정수 배율만큼 reduce(박스 평균)로 줄인 뒤 남은 배율만 필터로 리사이즈
+    """
+    if image.size == tuple(size):
+        return image
+    
+    settings = RESIZE_MODES[resize_mode]
+    width, height = size
+    gap = settings["reducing_gap"]
+    
+    # 이미 디코딩된 이미지나 JPEG 외 포맷에서는 아무 일도 하지 않음
+    image.draft(None, (int(width * gap), int(height * gap)))
+    with span("decode"):
+        image.load()
+    if image.size == tuple(size):
+        return image
+    
+    with span("resize"):
+        if image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
         
-        # 크기 맞춤
-        if img.size != (cell_width, cell_height):
-            img = img.resize((cell_width, cell_height), Image.Resampling.LANCZOS)
+        factor_x = int(image.width / (width * gap))
+        factor_y = int(image.height / (height * gap))
+        if factor_x >= 2 or factor_y >= 2:
+            image = image.reduce((max(1, factor_x), max(1, factor_y)))
+        if image.size == tuple(size):
+            return image
         
-        final_image.paste(img, (x, y))
+        return image.resize(size, settings["filter"])
+
+def get_content_hash(path: str) -> str:
+    """
+    원본 파일 내용 해시 (경로/mtime/크기가 같으면 메모리 캐시 사용)
+    """
+    stat = os.stat(path)
+    return hash_file_content(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+@lru_cache(maxsize=4096)
+def hash_file_content(path: str, mtime_ns: int, size: int) -> str:
+    return hash_file(path)
+
+def derivative_path(content_hash: str, variant: str, fmt: str, quality_preset: str) -> str:
+    """
+    축소본 캐시 경로 (해시 앞 2글자로 디렉토리 분산, 너비/프리셋이 바뀌면 다른 파일)
+    """
+    width = DERIVATIVE_VARIANTS[variant]
+    return shard_path(
+        DERIVATIVE_DIR,
+        content_hash,
+        f"{content_hash}_{variant}_{width}w_{quality_preset}.{FORMAT_EXTENSIONS[fmt]}"
+    )
+
+def final_output_path(episode_id: int, fmt: str = "png") -> str:
+    """
+    최종 웹툰 이미지 경로 (에피소드 디렉토리 안, 다시 만들면 교체)
+    """
+    return storage.episode_path(episode_id, f"episode_{episode_id:03d}_final.{FORMAT_EXTENSIONS[fmt]}")
+
+def sub_filter_rows(band: Image.Image) -> bytes:
+    """
+    RGB 행들에 PNG Sub 필터 적용 (각 바이트 - 왼쪽 픽셀 같은 채널, mod 256)
+    """
+    width, rows = band.size
+    shifted = Image.new('RGB', band.size, (0, 0, 0))
+    shifted.paste(band.crop((0, 0, width - 1, rows)), (1, 0))
+    data = ImageChops.subtract_modulo(band, shifted).tobytes()
+    
+    stride = width * 3
+    return b"".join(b"\x01" + data[row * stride:(row + 1) * stride] for row in range(rows))
+
+def write_png_chunk(f, chunk_type: bytes, data: bytes):
+    """
+    PNG 청크 기록 (길이 + 타입 + 데이터 + CRC)
+    """
+    f.write(struct.pack(">I", len(data)))
+    f.write(chunk_type)
+    f.write(data)
+    f.write(struct.pack(">I", zlib.crc32(chunk_type + data) & 0xFFFFFFFF))
+
+def get_peak_rss_mb() -> float:
+    """
+    프로세스 최대 RSS (MB, 프로세스 시작 이후 최고치 - 요청별 값은 RssSampler 사용)
+    """
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def get_current_rss_bytes() -> int:
+    """
+    현재 RSS (바이트, /proc이 없는 환경이면 0)
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+class RssSampler:
+    """
+    요청 처리 중 현재 RSS를 주기적으로 읽어 시작 대비 최대 증가량 측정
+    
+    ru_maxrss는 프로세스 수명 전체의 최고치라 오래 떠 있는 서버에서는 이전 요청의 값이 계속 보이므로,
+    백그라운드 스레드가 RSS_SAMPLE_INTERVAL마다 현재 RSS를 읽는다.
+    같은 프로세스에서 동시에 처리 중인 다른 요청의 메모리도 함께 잡히고,
+    앞선 요청이 쓰고 할당자에 남겨둔 메모리를 재사용하면 증가량은 0에 가깝게 나온다 (rss_peak_mb와 함께 볼 것).
+    """
+    
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start_bytes = 0
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> "RssSampler":
+        self.start_bytes = self.peak_bytes = get_current_rss_bytes()
+        if self.start_bytes:
+            self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+    
+    def sample(self):
+        self.peak_bytes = max(self.peak_bytes, get_current_rss_bytes())
+    
+    def stop(self):
+        """
+        샘플링 종료 (여러 번 불러도 됨)
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.sample()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        metadata용 요청 중 최대 RSS와 시작 대비 증가량 (측정 불가 환경이면 빈 dict)
+        """
+        if not self.start_bytes:
+            return {}
+        return {
+            "rss_peak_mb": round(self.peak_bytes / (1024 * 1024), 1),
+            "rss_delta_mb": round((self.peak_bytes - self.start_bytes) / (1024 * 1024), 1)
+        }
+
+def merge_grid(
+    images: List[Image.Image],
+    spacing: int = 10,
+    columns: int = 2,
+    resize_mode: str = DEFAULT_RESIZE_MODE,
+    page_width: Optional[int] = None
+) -> Image.Image:
+    """
+    그리드(페이지) 형식으로 이미지 병합
+    
+    행마다 높이를 맞춰 비율을 유지한 채 페이지 폭을 채우고, 셀 리사이즈는 스레드 풀에서 병렬 실행
+    """
+    if not images:
+        raise ValueError("No images to merge")
+    
+    page_width, total_height, cells = compute_grid_layout(
+        [img.size for img in images], columns, spacing, page_width
+    )
+    
+    # 새 이미지 생성
+    final_image = Image.new('RGB', (page_width, total_height), (255, 255, 255))
+    
+    # 셀 크기로 병렬 리사이즈 후 순서대로 배치
+    with ThreadPoolExecutor(max_workers=GRID_RESIZE_WORKERS) as executor:
+        resized = executor.map(
+            bind_trace(lambda item: resize_image(item[0], item[1][2:], resize_mode)),
+            zip(images, cells)
+        )
+        for (x, y, _, _), img in zip(cells, resized):
+            with span("paste"):
+                final_image.paste(img, (x, y))
     
     return final_image
 
+def compute_grid_layout(
+    sizes: List[tuple],
+    columns: int = 2,
+    spacing: int = 10,
+    page_width: Optional[int] = None
+) -> tuple:
+    """
+    패널 크기만으로 그리드 레이아웃 계산 (페이지 폭, 전체 높이, 셀별 (x, y, 폭, 높이))
+    
+    꽉 찬 행은 비율을 유지한 채 페이지 폭에 맞도록 행 높이를 정하고,
+    마지막 미완성 행은 앞 행 높이를 넘지 않게 왼쪽 정렬
+    """
+    if columns < 1:
+        raise ValueError("columns must be at least 1")
+    if page_width is None:
+        page_width = sizes[0][0] * columns + spacing * (columns - 1)
+    
+    cells = []
+    y = 0
+    row_height = None
+    for start in range(0, len(sizes), columns):
+        row = sizes[start:start + columns]
+        aspects = [w / h for w, h in row]
+        available = page_width - spacing * (len(row) - 1)
+        if available <= 0:
+            raise ValueError("page_width is too small for the requested columns and spacing")
+        
+        fitted_height = available / sum(aspects)
+        if len(row) < columns and row_height is not None:
+            fitted_height = min(fitted_height, row_height)
+        row_height = max(1, round(fitted_height))
+        
+        widths = [max(1, round(aspect * fitted_height)) for aspect in aspects]
+        if len(row) == columns:
+            # 반올림 오차는 마지막 셀이 흡수해서 행이 페이지 폭에 정확히 맞게 함
+            widths[-1] = max(1, available - sum(widths[:-1]))
+        
+        x = 0
+        for width in widths:
+            cells.append((x, y, width, row_height))
+            x += width + spacing
+        y += row_height + spacing
+    
+    return page_width, y - spacing, cells
+
+# 비동기 작업 API (POST 즉시 job_id 반환, GET으로 상태/진행률/결과 조회)
+jobs = JobManager("packaging")
+jobs.register("webtoon", package_webtoon, PackagingRequest)
+jobs.register("derivatives", create_derivatives, DerivativeRequest)
+jobs.install(app, "/engine/pack")
+
+# 저장된 패널/최종 이미지 직접 서빙 (Range, ETag, immutable 캐시)
+install_asset_routes(app, "/engine/pack", STORAGE_DIR)
+
+# Prometheus 메트릭 (요청/외부 API 지연, 캐시, 작업 큐)
+metrics = install_metrics(app, "packaging", jobs)
+metrics.add_collector(lambda: [(
+    "toonverse_process_max_rss_bytes", "gauge", "Peak resident memory since process start", {},
+    get_peak_rss_mb() * 1024 * 1024
+)])
+
+# 단계별 구간 추적 (X-Toonverse-Trace 헤더 또는 trace 플래그)
+install_tracing(app)
+
 if __name__ == "__main__":
     print("=" * 60)
     print("📦 TOONVERSE Packaging Engine Starting...")
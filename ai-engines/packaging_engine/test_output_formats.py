@@ -0,0 +1,83 @@
+"""
+출력 포맷 처리 테스트
+
+Pillow 빌드가 저장하지 못하는 포맷(예: AVIF)은 요청 전체를 실패시키지 않고
+건너뛴 포맷으로 metadata.encodings에 표시되어야 한다.
+
+    python -m pytest test_output_formats.py -q
+"""
+import os
+import sys
+import tempfile
+
+# main 임포트 전에 저장 경로를 임시 디렉토리로 돌린다
+os.environ["IMAGE_STORAGE_DIR"] = tempfile.mkdtemp(prefix="toonverse_test_")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from PIL import Image  # noqa: E402
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def without_avif(monkeypatch):
+    available = main.is_format_available
+    monkeypatch.setattr(main, "is_format_available", lambda fmt: fmt != "avif" and available(fmt))
+
+
+@pytest.fixture
+def panels(tmp_path):
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"panel_{i + 1}.png"
+        Image.new("RGB", (120, 160), (40 * i, 80, 120)).save(path)
+        paths.append(str(path))
+    return [{"panel_number": i + 1, "lettered_image_url": path} for i, path in enumerate(paths)]
+
+
+def test_resolve_skips_unavailable_format(without_avif):
+    formats, skipped = main.resolve_output_formats(["png", "avif", "jpg"], "balanced")
+
+    assert formats == ["png", "jpeg"]
+    assert list(skipped) == ["avif"]
+    assert "skipped" in skipped["avif"]
+
+
+def test_resolve_fails_when_nothing_is_available(without_avif):
+    with pytest.raises(ValueError):
+        main.resolve_output_formats(["avif"], "balanced")
+
+
+def test_resolve_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        main.resolve_output_formats(["png", "bmp"], "balanced")
+
+
+def test_package_encodes_available_formats_and_reports_skipped(without_avif, panels):
+    client = TestClient(main.app)
+    response = client.post("/engine/pack/webtoon", json={
+        "episode_id": 901,
+        "panels": panels,
+        "output_formats": ["png", "avif"]
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [output["format"] for output in body["result"]["outputs"]] == ["png"]
+    assert os.path.exists(body["result"]["final_webtoon_url"])
+    encodings = body["metadata"]["encodings"]
+    assert encodings["png"]["file_size"] > 0
+    assert "skipped" in encodings["avif"]
+
+
+def test_derivatives_with_only_unavailable_format_fail(without_avif, panels):
+    client = TestClient(main.app)
+    response = client.post("/engine/pack/derivatives", json={
+        "image_paths": [panels[0]["lettered_image_url"]],
+        "output_format": "avif"
+    })
+
+    assert response.status_code == 500
+    assert "avif" in response.json()["detail"]
@@ -0,0 +1,83 @@
+"""
+에피소드 파이프라인 벤치마크
+
+기존 파일 핸드오프 경로(레터링 엔진이 패널 PNG 저장 → 패키징 엔진이 다시 읽어 병합)와
+메모리 핸드오프 파이프라인(/engine/pipeline/episode)의 소요 시간과 디스크 기록량을 비교한다.
+
+    python benchmark_pipeline.py --panels 15 --width 1024 --height 1792
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 엔진 모듈 임포트 전에 저장 경로를 임시 디렉토리로 돌린다
+os.environ["IMAGE_STORAGE_DIR"] = tempfile.mkdtemp(prefix="toonverse_bench_")
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+import main  # noqa: E402
+from lettering_engine import main as lettering  # noqa: E402
+from packaging_engine import main as packaging  # noqa: E402
+
+DIALOGUE = "네가 무엇을 하려는지 다 알고 있어. 그건 허락할 수 없지."
+
+
+def make_panels(count: int, width: int, height: int):
+    panels = []
+    for i in range(count):
+        path = os.path.join(main.storage.root, f"bench_source_{i + 1:03d}.png")
+        Image.effect_noise((width, height), 40).convert('RGB').save(path, 'PNG')
+        panels.append(lettering.LetteringRequest(
+            panel_number=i + 1,
+            image_path=path,
+            dialogue=DIALOGUE if i % 3 else "",
+            speaker="주인공",
+        ))
+    return panels
+
+
+def run_file_handoff(episode_id: int, panels):
+    bytes_written = 0
+    lettered = []
+    for panel in panels:
+        result = lettering.letter_panel(panel)
+        bytes_written += os.path.getsize(result["lettered_image_url"])
+        lettered.append(packaging.PanelInfo(
+            panel_number=panel.panel_number,
+            lettered_image_url=result["lettered_image_url"],
+        ))
+
+    response = packaging.package_webtoon(packaging.PackagingRequest(episode_id=episode_id, panels=lettered))
+    return bytes_written + os.path.getsize(response.result["final_webtoon_url"])
+
+
+def run_in_memory(episode_id: int, panels):
+    response = main.run_episode_pipeline(main.PipelineRequest(episode_id=episode_id, panels=panels))
+    return response.metadata["bytes_written"]
+
+
+def run(panel_count: int, width: int, height: int):
+    panels = make_panels(panel_count, width, height)
+
+    print(f"panels={panel_count} image={width}x{height}")
+    print(f"{'path':>14} {'wall_s':>8} {'written_mb':>11}")
+    for label, fn in (("file handoff", run_file_handoff), ("in-memory", run_in_memory)):
+        start = time.perf_counter()
+        written = fn(1, panels)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>14} {elapsed:>8.2f} {written / (1024 * 1024):>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-memory episode pipeline benchmark")
+    parser.add_argument("--panels", type=int, default=15)
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--height", type=int, default=1792)
+    args = parser.parse_args()
+
+    run(args.panels, args.width, args.height)
@@ -0,0 +1,230 @@
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel
+from typing import Dict, Any, List
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from PIL import Image
+
+# 레터링/패키징 엔진 모듈을 그대로 재사용 (ai-engines 디렉토리 기준 임포트)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.assets import asset_endpoint, install_asset_routes  # noqa: E402
+from common.jobs import JobManager, report_progress  # noqa: E402
+from common.metrics import install_metrics  # noqa: E402
+from common.tracing import begin_trace, install_tracing, span, trace_metadata  # noqa: E402
+from lettering_engine.main import LetteringRequest, letter_image  # noqa: E402
+from packaging_engine.main import (  # noqa: E402
+    DEFAULT_RESIZE_MODE,
+    FINAL_DIR,
+    RESIZE_MODES,
+    encode_image,
+    final_output_path,
+    merge_panels,
+    resolve_output_formats,
+    storage
+)
+
+app = FastAPI(
+    title="TOONVERSE Pipeline Engine",
+    version="1.0.0",
+    description="Single-call lettering + packaging with in-memory panel handoff"
+)
+
+# CORS 설정
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+class PipelineRequest(BaseModel):
+    episode_id: int
+    panels: List[LetteringRequest]
+    layout: str = "vertical"  # vertical, grid
+    spacing: int = 10  # 패널 간 간격 (px), grid에서는 행/열 거터
+    columns: int = 2  # grid: 한 행의 패널 수
+    save_lettered_panels: bool = False  # 개별 레터링 패널도 파일로 남길지
+    output_formats: List[str] = ["png"]  # /engine/pack/webtoon과 같은 인코더 (png, webp, jpeg, avif)
+    quality_preset: str = "balanced"  # low, balanced, high
+    resize_mode: str = DEFAULT_RESIZE_MODE  # quality, fast
+    trace: bool = False  # 단계별 소요 시간을 metadata.timings로 반환
+
+class PipelineResponse(BaseModel):
+    success: bool
+    result: Dict[str, Any]
+    metadata: Dict[str, Any]
+
+@app.get("/")
+def root():
+    """Health check endpoint"""
+    return {
+        "service": "TOONVERSE Pipeline Engine",
+        "version": "1.0.0",
+        "status": "running",
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/health")
+def health_check():
+    """Detailed health check"""
+    storage_writable = os.access(FINAL_DIR, os.W_OK)
+    
+    return {
+        "status": "healthy",
+        "service": "pipeline_engine",
+        "storage_dir": FINAL_DIR,
+        "storage_writable": storage_writable,
+        "jobs": jobs.stats(),
+        "timestamp": datetime.now().isoformat(),
+        "endpoints": [
+            "/",
+            "/health",
+            "/engine/pipeline/episode",
+            *jobs.endpoints("/engine/pipeline"),
+            asset_endpoint("/engine/pipeline"),
+            "/metrics"
+        ]
+    }
+
+@app.post("/engine/pipeline/episode", response_model=PipelineResponse)
+def run_episode_pipeline(request: PipelineRequest):
+    """
+    생성된 패널 이미지에 대사 합성 후 최종 웹툰으로 병합 (한 번의 호출)
+    
+    패널은 디코딩 1회 후 메모리에서 레터링/병합하고, 최종 결과만 파일로 저장
+    (인코딩 포맷/프리셋/리사이즈 방식은 패키징 엔진과 같아 같은 입력이면 같은 결과)
+    """
+    start_time = time.time()
+    begin_trace("pipeline.episode", request.trace)
+    
+    try:
+        if not request.panels:
+            raise ValueError("No panels provided")
+        
+        formats, skipped = resolve_output_formats(request.output_formats, request.quality_preset)
+        if request.resize_mode not in RESIZE_MODES:
+            raise ValueError(f"Unknown resize_mode: {request.resize_mode}")
+        bytes_written = 0
+        lettered_images = []
+        panel_images = []
+        
+        for panel in request.panels:
+            if not os.path.exists(panel.image_path):
+                raise FileNotFoundError(f"Image not found: {panel.image_path}")
+            
+            with span("decode"):
+                img = Image.open(panel.image_path)
+                img.load()
+            letter_image(
+                img,
+                panel.dialogue,
+                panel.speaker,
+                panel.bubble_position,
+                panel.font_size,
+                panel.line_break
+            )
+            panel_images.append(img)
+            report_progress(len(panel_images), len(request.panels))
+            
+            if request.save_lettered_panels:
+                lettered_path, written = storage.write_image(img, "png")
+                bytes_written += written
+                lettered_images.append({
+                    "panel_number": panel.panel_number,
+                    "lettered_image_url": lettered_path,
+                    "dialogue": panel.dialogue,
+                    "speaker": panel.speaker
+                })
+        
+        final_image = merge_panels(
+            panel_images, request.layout, request.spacing, request.resize_mode, columns=request.columns
+        )
+        
+        # 요청한 포맷별로 최종 이미지 저장 (패키징 엔진의 인코더 프리셋, 임시 파일에 쓴 뒤 교체)
+        outputs = []
+        encodings = {}
+        for fmt in formats:
+            try:
+                output = encode_image(
+                    final_image, fmt, request.quality_preset, final_output_path(request.episode_id, fmt)
+                )
+            except Exception as e:
+                encodings[fmt] = {"error": str(e)}
+                continue
+            outputs.append(output)
+            encodings[fmt] = {"file_size": output["file_size"], "encode_time": output["encode_time"]}
+            bytes_written += output["file_size"]
+        
+        if not outputs:
+            raise ValueError(f"All output encodings failed: {encodings}")
+        output_path = outputs[0]["url"]
+        file_size = outputs[0]["file_size"]
+        
+        processing_time = time.time() - start_time
+        
+        return PipelineResponse(
+            success=True,
+            result={
+                "episode_id": request.episode_id,
+                "final_webtoon_url": output_path,
+                "width": final_image.width,
+                "height": final_image.height,
+                "total_panels": len(panel_images),
+                "file_size_mb": round(file_size / (1024 * 1024), 2),
+                "outputs": outputs,
+                "lettered_images": lettered_images
+            },
+            metadata={
+                "engine_version": "1.0.0",
+                "cost_units": 0.0,
+                "processing_time": round(processing_time, 2),
+                "layout": request.layout,
+                "quality_preset": request.quality_preset,
+                "resize_mode": request.resize_mode,
+                "encodings": {**encodings, **skipped},
+                "bytes_written": bytes_written,
+                **trace_metadata()
+            }
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# 비동기 작업 API (POST 즉시 job_id 반환, GET으로 상태/진행률/결과 조회)
+jobs = JobManager("pipeline")
+jobs.register("episode", run_episode_pipeline, PipelineRequest)
+jobs.install(app, "/engine/pipeline")
+
+# 저장된 패널/최종 이미지 직접 서빙 (Range, ETag, immutable 캐시)
+install_asset_routes(app, "/engine/pipeline", storage.root)
+
+# Prometheus 메트릭 (요청/외부 API 지연, 캐시, 작업 큐)
+metrics = install_metrics(app, "pipeline", jobs)
+
+# 단계별 구간 추적 (X-Toonverse-Trace 헤더 또는 trace 플래그)
+install_tracing(app)
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔗 TOONVERSE Pipeline Engine Starting...")
+    print("=" * 60)
+    print(f"📍 API URL: http://0.0.0.0:8006")
+    print(f"📚 Docs: http://0.0.0.0:8006/docs")
+    print(f"🔍 Health: http://0.0.0.0:8006/health")
+    print(f"💾 Storage: {FINAL_DIR}")
+    print("=" * 60)
+    
+    import uvicorn
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8006,
+        reload=True,
+        log_level="info"
+    )
@@ -4,7 +4,15 @@ from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 import uvicorn
 import time
+import sys
 from datetime import datetime
+from pathlib import Path
+
+# 공통 모듈 (ai-engines 디렉토리 기준 임포트)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.jobs import JobManager  # noqa: E402
+from common.metrics import install_metrics  # noqa: E402
 
 app = FastAPI(
     title="TOONVERSE Text Engine",
@@ -52,11 +60,14 @@ def health_check():
     return {
         "status": "healthy",
         "service": "text_engine",
+        "jobs": jobs.stats(),
         "timestamp": datetime.now().isoformat(),
         "endpoints": [
             "/",
             "/health",
-            "/engine/text/script"
+            "/engine/text/script",
+            *jobs.endpoints("/engine/text"),
+            "/metrics"
         ]
     }
 
@@ -253,6 +264,14 @@ def parse_scenes(script_text: str) -> List[Dict[str, Any]]:
     
     return scenes
 
+# 비동기 작업 API (POST 즉시 job_id 반환, GET으로 상태/진행률/결과 조회)
+jobs = JobManager("text")
+jobs.register("script", generate_script, EngineRequest)
+jobs.install(app, "/engine/text")
+
+# Prometheus 메트릭 (요청/외부 API 지연, 캐시, 작업 큐)
+metrics = install_metrics(app, "text", jobs)
+
 if __name__ == "__main__":
     print("=" * 60)
     print("🚀 TOONVERSE Text Engine Starting...")
@@ -112,7 +112,7 @@ echo "📖 에피소드 ID: $EPISODE_ID"
 echo "🎯 Job ID: $JOB_ID"
 echo ""
 echo "🌐 최종 웹툰 URL:"
-echo "   https://toonverse.store/storage/images/final/episode_$(printf "%03d" $EPISODE_ID)_final.png"
+echo "   https://toonverse.store/storage/images/episodes/$(printf "%02x" $((EPISODE_ID % 256)))/$EPISODE_ID/episode_$(printf "%03d" $EPISODE_ID)_final.png"
 echo ""
 echo "========================================="
 echo "✅ HTTPS 웹툰 생성 테스트 성공!"